@@ -7,7 +7,7 @@ to extract manufacturing metrics for RL training.
 
 import numpy as np
 import trimesh
-from typing import Dict, List, Tuple, Optional
+from typing import BinaryIO, Dict, List, Tuple, Optional, Union
 import time
 
 def validate_and_fix_mesh(mesh) -> Tuple[trimesh.Trimesh, bool]:
@@ -126,21 +126,28 @@ class FDMSimulator:
                 else:
                     raise ValueError(f"Required configuration key '{key}' is missing and has no default value.")
     
-    def load_stl(self, file_path: str) -> bool:
+    def load_stl(self, file_path: Union[str, BinaryIO], file_name: Optional[str] = None) -> bool:
         """
         Load STL file for simulation.
         
         Args:
-            file_path: Path to STL file
+            file_path: Path to STL file, or a binary file object with STL data
+                (e.g. io.BytesIO of an upload) read without touching disk
+            file_name: Name to report for a file object; defaults to its name
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            print(f"Loading STL file: {file_path}")
-            loaded_mesh = trimesh.load(file_path)
+            if isinstance(file_path, str):
+                file_name = file_name or file_path
+                loaded_mesh = trimesh.load(file_path)
+            else:
+                file_name = file_name or getattr(file_path, 'name', 'uploaded.stl')
+                loaded_mesh = trimesh.load(file_path, file_type='stl')
+            print(f"Loading STL file: {file_name}")
             
-            self.current_file = file_path
+            self.current_file = file_name
             
             # Handle different types of loaded objects
             if isinstance(loaded_mesh, trimesh.Scene):
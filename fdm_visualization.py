@@ -5,29 +5,133 @@ This module provides 3D visualization capabilities for FDM printing simulation,
 including layer-by-layer printing visualization, support structures, and print paths.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import pyvista as pv
 import trimesh
 from typing import Dict, List, Optional, Tuple
-import time
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-import io
-import base64
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba is optional; the numpy implementations below are used instead
+    NUMBA_AVAILABLE = False
+
+# Errors trimesh/shapely raise for degenerate or empty cross-sections
+_SECTION_ERRORS = (AttributeError, IndexError, ValueError)
+
+# Parts above this many faces are decimated before being sent to the browser
+DISPLAY_FACE_LIMIT = 50_000
+
+# Offsets of the 5 molten plastic droplets below the nozzle, relative to the current layer
+_STREAM_OFFSETS = np.array([[0, 0, 4 - k * 0.8] for k in range(5)], dtype=np.float32)
+
+
+def _build_prism_faces_numpy(n_vertices: int, vertex_offset: int = 0) -> np.ndarray:
+    """
+    Build triangle faces for a polygon extruded into a thin slab.
+    
+    Vertices are expected as n_vertices bottom points followed by the same
+    n_vertices top points, starting at vertex_offset.
+    
+    Returns:
+        (F, 3) integer array: fan-triangulated bottom, reversed top, then side walls
+    """
+    v = vertex_offset
+    n = n_vertices
+    
+    # Bottom face (fan triangulation from first vertex) and top face (reversed)
+    i = np.arange(1, n - 1)
+    bottom = np.stack([np.full_like(i, v), v + i, v + i + 1], axis=1)
+    top = np.stack([np.full_like(i, v + n), v + n + i + 1, v + n + i], axis=1)
+    
+    # Side faces, two triangles per edge
+    # Successor of each vertex around the ring, wrapping the last back to the first
+    i = np.arange(n)
+    next_i = np.empty_like(i)
+    next_i[:-1] = i[1:]
+    next_i[-1:] = 0
+    sides = np.stack([
+        np.stack([v + i, v + next_i, v + n + i], axis=1),
+        np.stack([v + next_i, v + n + next_i, v + n + i], axis=1)
+    ], axis=1).reshape(-1, 3)
+    
+    return np.concatenate([bottom, top, sides])
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _build_prism_faces_jit(n_vertices, vertex_offset=0):
+        """Compiled equivalent of _build_prism_faces_numpy, filling the face array in one pass."""
+        v = vertex_offset
+        n = n_vertices
+        n_cap = max(n - 2, 0)
+        faces = np.empty((2 * n_cap + 2 * n, 3), dtype=np.int64)
+        
+        for i in range(1, n - 1):
+            f = i - 1
+            faces[f, 0] = v
+            faces[f, 1] = v + i
+            faces[f, 2] = v + i + 1
+            
+            f += n_cap
+            faces[f, 0] = v + n
+            faces[f, 1] = v + n + i + 1
+            faces[f, 2] = v + n + i
+        
+        for i in range(n):
+            next_i = i + 1 if i + 1 < n else 0
+            f = 2 * n_cap + 2 * i
+            faces[f, 0] = v + i
+            faces[f, 1] = v + next_i
+            faces[f, 2] = v + n + i
+            faces[f + 1, 0] = v + next_i
+            faces[f + 1, 1] = v + n + next_i
+            faces[f + 1, 2] = v + n + i
+        
+        return faces
+    
+    _build_prism_faces = _build_prism_faces_jit
+else:
+    _build_prism_faces = _build_prism_faces_numpy
+
 
 class FDMVisualizer:
     """3D visualization for FDM printing simulation."""
     
-    def __init__(self):
-        """Initialize the visualizer."""
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initialize the visualizer.
+        
+        Args:
+            seed: Optional seed for the random jitter in the layer point clouds
+        """
         self.mesh = None
         self.layers = []
         self.support_regions = []
         self.print_paths = []
         
+        # Mesh bounds and extent, computed once per loaded mesh
+        self._bounds = None
+        self._extent = None
+        
+        # Per-layer caches for the print path view, keyed by layer index
+        self._outline_cache = {}
+        self._paths_cache = {}
+        
+        # Cross-sections keyed by Z height rounded to 6 decimals, shared by every
+        # helper that slices the mesh
+        self._section_cache = {}
+        
+        # Decimated copies of the mesh for display, keyed by face budget
+        self._display_cache = {}
+        
+        # One generator for the visualizer's lifetime, plus a scratch buffer for its samples
+        self._rng = np.random.default_rng(seed)
+        self._jitter_scratch = np.empty(0)
+        
     def load_mesh_data(self, mesh: trimesh.Trimesh, layers: List[Dict], 
                       support_data: Optional[Dict] = None):
         """
@@ -40,15 +144,26 @@ class FDMVisualizer:
         """
         self.mesh = mesh
         self.layers = layers
+        if NUMBA_AVAILABLE:
+            _build_prism_faces(3, 0)  # Compile up front rather than on the first animation frame
+        self._bounds = np.asarray(mesh.bounds) if mesh is not None else None
+        self._extent = self._bounds[1] - self._bounds[0] if mesh is not None else None
+        self._outline_cache.clear()
+        self._paths_cache.clear()
+        self._section_cache.clear()
+        self._display_cache.clear()
         if support_data:
             self.support_regions = self._extract_support_regions(support_data)
     
-    def create_3d_mesh_view(self, show_supports: bool = True) -> go.Figure:
+    def create_3d_mesh_view(self, show_supports: bool = True,
+                            resolution: Optional[int] = DISPLAY_FACE_LIMIT) -> go.Figure:
         """
         Create 3D visualization of the mesh with optional support structures.
         
         Args:
             show_supports: Whether to show support structures
+            resolution: Maximum number of faces to draw; larger meshes are
+                decimated for display only. None draws the full mesh.
             
         Returns:
             Plotly figure
@@ -58,9 +173,10 @@ class FDMVisualizer:
         
         fig = go.Figure()
         
-        # Main mesh
-        vertices = self.mesh.vertices
-        faces = self.mesh.faces
+        # Main mesh, as shared vertices plus face indices so each vertex is sent once
+        display_mesh = self._display_mesh(resolution)
+        vertices = display_mesh.vertices
+        faces = display_mesh.faces
         
         fig.add_trace(go.Mesh3d(
             x=vertices[:, 0],
@@ -114,6 +230,23 @@ class FDMVisualizer:
         Returns:
             Plotly figure with educational printing animation
         """
+        fig, state = self._build_animation_figure(max_layers)
+        fig.frames = [self._build_animation_frame(state, i) for i in range(len(state['z_positions']))]
+        return fig
+    
+    def _build_animation_figure(self, max_layers: int) -> Tuple[go.Figure, Dict]:
+        """
+        Build the educational animation figure without frames.
+        
+        All layer meshes are sliced once here and added as hidden traces, so each
+        frame only needs visibility and styling updates.
+        
+        Args:
+            max_layers: Maximum number of layers to animate
+            
+        Returns:
+            (figure with initial data and controls, layer state for _build_animation_frame)
+        """
         if not self.layers:
             raise ValueError("No layer data available.")
         
@@ -122,143 +255,25 @@ class FDMVisualizer:
         z_positions = [layer['z_height'] for layer in display_layers]
         
         # Get mesh bounds for positioning elements
-        bounds = self.mesh.bounds if self.mesh else np.array([[-50, -50, 0], [50, 50, 50]])
+        bounds = self._bounds if self.mesh else np.array([[-50, -50, 0], [50, 50, 50]])
         
-        # Create educational frames
-        frames = []
+        # Build every layer mesh once; frames only toggle visibility and styling
+        layer_meshes = self._create_real_layer_meshes(z_positions)
+        layer_indices = [j for j, layer_mesh in enumerate(layer_meshes) if layer_mesh is not None]
         
-        for i, layer in enumerate(display_layers):
-            current_z = z_positions[i]
-            
-            # Create frame data
-            frame_data = []
-            
-            # 1. Show the build platform (always visible)
-            platform_size = max(bounds[1][0] - bounds[0][0], bounds[1][1] - bounds[0][1]) * 1.2
-            platform_z = bounds[0][2] - 2
-            
-            frame_data.append(go.Mesh3d(
-                x=[bounds[0][0] - platform_size/4, bounds[1][0] + platform_size/4, 
-                   bounds[1][0] + platform_size/4, bounds[0][0] - platform_size/4],
-                y=[bounds[0][1] - platform_size/4, bounds[0][1] - platform_size/4, 
-                   bounds[1][1] + platform_size/4, bounds[1][1] + platform_size/4],
-                z=[platform_z, platform_z, platform_z, platform_z],
-                i=[0, 1], j=[1, 2], k=[2, 3],
-                color='rgb(100, 100, 100)',
-                opacity=0.3,
-                name='Build Platform',
-                showscale=False,
-                hovertemplate='Build Platform<extra></extra>'
-            ))
-            
-            # 2. Show completed layers (with layer-by-layer color progression)
-            visible_z = z_positions[:i+1]
-            layer_meshes = self._create_real_layer_meshes(visible_z)
-            
-            # Combine all previous layers with distinct colors
-            for j, layer_mesh in enumerate(layer_meshes):
-                if layer_mesh is not None:
-                    # Color progression: early layers are cooler (blue), recent layers are warmer (red)
-                    layer_age = (i - j) / max(i, 1)  # 0 = newest, 1 = oldest
-                    
-                    if layer_age < 0.1:  # Current layer - bright and warm
-                        color = 'rgb(255, 100, 50)'  # Bright orange-red (hot plastic)
-                        opacity = 1.0
-                        layer_name = f'🔥 Layer {j+1} (Just Printed!)'
-                    elif layer_age < 0.3:  # Recent layers - warm
-                        color = 'rgb(255, 150, 100)'  # Warm orange
-                        opacity = 0.9
-                        layer_name = f'🌡️ Layer {j+1} (Cooling)'
-                    else:  # Older layers - cooler
-                        color = 'rgb(100, 150, 255)'  # Cool blue
-                        opacity = 0.8
-                        layer_name = f'❄️ Layer {j+1} (Solid)'
-                    
-                    frame_data.append(go.Mesh3d(
-                        x=layer_mesh['vertices'][:, 0],
-                        y=layer_mesh['vertices'][:, 1],
-                        z=layer_mesh['vertices'][:, 2],
-                        i=layer_mesh['faces'][:, 0],
-                        j=layer_mesh['faces'][:, 1],
-                        k=layer_mesh['faces'][:, 2],
-                        color=color,
-                        opacity=opacity,
-                        name=layer_name,
-                        showscale=False,
-                        hovertemplate=f'{layer_name}<br>Height: {visible_z[j]:.2f}mm<extra></extra>',
-                        lighting=dict(ambient=0.2, diffuse=1, fresnel=0.1, specular=1, roughness=0.1)
-                    ))
-            
-            # 3. Show print head/nozzle position
-            nozzle_x = bounds[0][0] + (bounds[1][0] - bounds[0][0]) * 0.7  # Position nozzle
-            nozzle_y = bounds[0][1] + (bounds[1][1] - bounds[0][1]) * 0.3
-            nozzle_z = current_z + 5  # 5mm above current layer
-            
-            frame_data.append(go.Scatter3d(
-                x=[nozzle_x],
-                y=[nozzle_y],
-                z=[nozzle_z],
-                mode='markers',
-                marker=dict(
-                    size=15,
-                    color='rgb(200, 50, 50)',
-                    symbol='diamond',
-                    line=dict(width=2, color='rgb(100, 0, 0)')
-                ),
-                name='🖨️ Print Head',
-                hovertemplate='Print Head<br>Printing Layer %{customdata}<extra></extra>',
-                customdata=[i+1]
-            ))
-            
-            # 4. Show extruded filament coming out (if not first layer)
-            if i > 0:
-                filament_stream = []
-                for k in range(5):  # Show 5 droplets
-                    stream_z = current_z + 4 - k * 0.8
-                    filament_stream.append([nozzle_x, nozzle_y, stream_z])
-                
-                if filament_stream:
-                    stream_array = np.array(filament_stream)
-                    frame_data.append(go.Scatter3d(
-                        x=stream_array[:, 0],
-                        y=stream_array[:, 1],
-                        z=stream_array[:, 2],
-                        mode='markers',
-                        marker=dict(
-                            size=3,
-                            color='rgb(255, 200, 0)',
-                            opacity=0.8
-                        ),
-                        name='💧 Molten Plastic',
-                        hovertemplate='Molten Plastic<br>Temperature: ~200°C<extra></extra>'
-                    ))
-            
-            # 5. Add progress indicators
-            progress_text = f"Layer {i+1} of {len(display_layers)}<br>"
-            progress_text += f"Height: {current_z:.1f}mm<br>"
-            progress_text += f"Progress: {((i+1)/len(display_layers)*100):.0f}%"
-            
-            frame_data.append(go.Scatter3d(
-                x=[bounds[1][0] + 10],
-                y=[bounds[1][1] + 10],
-                z=[current_z],
-                mode='text',
-                text=[progress_text],
-                textposition='middle center',
-                textfont=dict(size=12, color='rgb(0, 0, 0)'),
-                name='📊 Progress',
-                showlegend=False
-            ))
-            
-            # Create frame
-            frame = go.Frame(
-                data=frame_data,
-                name=str(i),
-                layout=dict(
-                    title=f"🖨️ 3D Printing Layer {i+1} - {progress_text.split('<br>')[2]}"
-                )
-            )
-            frames.append(frame)
+        # Trace layout: platform, one trace per layer, print head, molten plastic, text
+        first_layer_trace = 1
+        nozzle_trace = first_layer_trace + len(layer_indices)
+        
+        nozzle_x = bounds[0][0] + (bounds[1][0] - bounds[0][0]) * 0.7  # Position nozzle
+        nozzle_y = bounds[0][1] + (bounds[1][1] - bounds[0][1]) * 0.3
+        
+        state = {
+            'z_positions': z_positions,
+            'layer_indices': layer_indices,
+            'animated_traces': list(range(first_layer_trace, nozzle_trace + 3)),
+            'nozzle_xy': (nozzle_x, nozzle_y)
+        }
         
         # Initial frame - show build platform and print head ready to start
         initial_data = []
@@ -277,13 +292,28 @@ class FDMVisualizer:
             color='rgb(100, 100, 100)',
             opacity=0.3,
             name='Build Platform',
+            uid='platform',
             showscale=False,
             hovertemplate='Build Platform<extra></extra>'
         ))
         
+        # Layer geometry, hidden until its frame is reached
+        for j in layer_indices:
+            layer_mesh = layer_meshes[j]
+            initial_data.append(go.Mesh3d(
+                x=layer_mesh.vertices[:, 0],
+                y=layer_mesh.vertices[:, 1],
+                z=layer_mesh.vertices[:, 2],
+                i=layer_mesh.faces[:, 0],
+                j=layer_mesh.faces[:, 1],
+                k=layer_mesh.faces[:, 2],
+                uid=f'layer-{j}',
+                visible=False,
+                showscale=False,
+                lighting=dict(ambient=0.2, diffuse=1, fresnel=0.1, specular=1, roughness=0.1)
+            ))
+        
         # Print head ready to start
-        nozzle_x = bounds[0][0] + (bounds[1][0] - bounds[0][0]) * 0.7
-        nozzle_y = bounds[0][1] + (bounds[1][1] - bounds[0][1]) * 0.3
         nozzle_z = z_positions[0] + 5
         
         initial_data.append(go.Scatter3d(
@@ -298,9 +328,28 @@ class FDMVisualizer:
                 line=dict(width=2, color='rgb(100, 0, 0)')
             ),
             name='🖨️ Print Head',
+            uid='nozzle',
             hovertemplate='Print Head<br>Ready to Start!<extra></extra>'
         ))
         
+        # Molten plastic stream, shown once printing is underway
+        stream = _STREAM_OFFSETS + np.array([nozzle_x, nozzle_y, z_positions[0]], dtype=np.float32)
+        initial_data.append(go.Scatter3d(
+            x=stream[:, 0],
+            y=stream[:, 1],
+            z=stream[:, 2],
+            mode='markers',
+            marker=dict(
+                size=3,
+                color='rgb(255, 200, 0)',
+                opacity=0.8
+            ),
+            name='💧 Molten Plastic',
+            uid='stream',
+            hovertemplate='Molten Plastic<br>Temperature: ~200°C<extra></extra>',
+            visible=False
+        ))
+        
         # Welcome message
         initial_data.append(go.Scatter3d(
             x=[bounds[1][0] + 10],
@@ -311,13 +360,11 @@ class FDMVisualizer:
             textposition='middle center',
             textfont=dict(size=14, color='rgb(0, 100, 0)'),
             name='Welcome',
+            uid='progress',
             showlegend=False
         ))
         
-        fig = go.Figure(
-            data=initial_data,
-            frames=frames
-        )
+        fig = go.Figure(data=initial_data)
         
         # Add educational animation controls
         fig.update_layout(
@@ -332,6 +379,7 @@ class FDMVisualizer:
                 )
             ),
             title='🎓 Educational 3D Printing Animation - See How Layer-by-Layer Manufacturing Works!',
+            uirevision='fdm-anim',
             updatemenus=[{
                 'type': 'buttons',
                 'showactive': False,
@@ -410,7 +458,82 @@ class FDMVisualizer:
             ]
         )
         
-        return fig
+        return fig, state
+    
+    def _build_animation_frame(self, state: Dict, i: int) -> go.Frame:
+        """
+        Build a single frame of the educational animation.
+        
+        Args:
+            state: Layer state returned by _build_animation_figure
+            i: Index of the layer being printed in this frame
+            
+        Returns:
+            Plotly frame updating the animated traces of the figure
+        """
+        z_positions = state['z_positions']
+        layer_indices = state['layer_indices']
+        nozzle_x, nozzle_y = state['nozzle_xy']
+        current_z = z_positions[i]
+        
+        # Create frame data
+        frame_data = []
+        
+        # 1. Show completed layers (with layer-by-layer color progression)
+        for j in layer_indices:
+            if j > i:
+                frame_data.append(go.Mesh3d(uid=f'layer-{j}', visible=False))
+                continue
+            
+            color, opacity, layer_name = self._get_layer_heat_style(i, j)
+            frame_data.append(go.Mesh3d(
+                uid=f'layer-{j}',
+                visible=True,
+                color=color,
+                opacity=opacity,
+                name=layer_name,
+                hovertemplate=f'{layer_name}<br>Height: {z_positions[j]:.2f}mm<extra></extra>'
+            ))
+        
+        # 2. Show print head/nozzle position
+        nozzle_z = current_z + 5  # 5mm above current layer
+        
+        frame_data.append(go.Scatter3d(
+            uid='nozzle',
+            z=[nozzle_z],
+            hovertemplate='Print Head<br>Printing Layer %{customdata}<extra></extra>',
+            customdata=[i+1]
+        ))
+        
+        # 3. Show extruded filament coming out (if not first layer)
+        stream = _STREAM_OFFSETS + np.array([nozzle_x, nozzle_y, current_z], dtype=np.float32)
+        frame_data.append(go.Scatter3d(
+            uid='stream',
+            z=stream[:, 2],
+            visible=i > 0
+        ))
+        
+        # 4. Add progress indicators
+        progress_text = f"Layer {i+1} of {len(z_positions)}<br>"
+        progress_text += f"Height: {current_z:.1f}mm<br>"
+        progress_text += f"Progress: {((i+1)/len(z_positions)*100):.0f}%"
+        
+        frame_data.append(go.Scatter3d(
+            uid='progress',
+            z=[current_z],
+            text=[progress_text],
+            textfont=dict(size=12, color='rgb(0, 0, 0)'),
+            name='📊 Progress'
+        ))
+        
+        return go.Frame(
+            data=frame_data,
+            traces=state['animated_traces'],
+            name=str(i),
+            layout=dict(
+                title=f"🖨️ 3D Printing Layer {i+1} - {progress_text.split('<br>')[2]}"
+            )
+        )
     
     def create_simple_printing_animation(self, max_layers: int = 50) -> go.Figure:
         """
@@ -425,7 +548,16 @@ class FDMVisualizer:
         z_positions = [layer['z_height'] for layer in display_layers]
         
         # Get mesh bounds for positioning
-        bounds = self.mesh.bounds if self.mesh else np.array([[-50, -50, 0], [50, 50, 50]])
+        bounds = self._bounds if self.mesh else np.array([[-50, -50, 0], [50, 50, 50]])
+        
+        # Build every layer mesh once; frames only toggle visibility
+        layer_meshes = self._create_real_layer_meshes(z_positions)
+        layer_indices = [j for j, layer_mesh in enumerate(layer_meshes) if layer_mesh is not None]
+        
+        # Trace layout: print bed, one trace per layer, print head, progress text
+        first_layer_trace = 1
+        head_trace = first_layer_trace + len(layer_indices)
+        animated_traces = list(range(first_layer_trace, head_trace + 2))
         
         # Create simple frames
         frames = []
@@ -434,97 +566,27 @@ class FDMVisualizer:
             current_z = z_positions[i]
             frame_data = []
             
-            # 1. Build platform (always visible)
-            platform_size = max(bounds[1][0] - bounds[0][0], bounds[1][1] - bounds[0][1]) * 1.1
-            platform_z = bounds[0][2] - 1
+            # 1. Show all completed layers in consistent color
+            for j in layer_indices:
+                frame_data.append(go.Mesh3d(uid=f'layer-{j}', visible=j <= i))
             
-            frame_data.append(go.Mesh3d(
-                x=[bounds[0][0] - platform_size/6, bounds[1][0] + platform_size/6, 
-                   bounds[1][0] + platform_size/6, bounds[0][0] - platform_size/6],
-                y=[bounds[0][1] - platform_size/6, bounds[0][1] - platform_size/6, 
-                   bounds[1][1] + platform_size/6, bounds[1][1] + platform_size/6],
-                z=[platform_z, platform_z, platform_z, platform_z],
-                i=[0, 1], j=[1, 2], k=[2, 3],
-                color='rgb(120, 120, 120)',
-                opacity=0.4,
-                name='Print Bed',
-                showscale=False
-            ))
-            
-            # 2. Show all completed layers in consistent color
-            visible_z = z_positions[:i+1]
-            layer_meshes = self._create_real_layer_meshes(visible_z)
-            
-            # Combine all layers into one clean mesh
-            combined_vertices = []
-            combined_faces = []
-            vertex_offset = 0
-            
-            for j, layer_mesh in enumerate(layer_meshes):
-                if layer_mesh is not None:
-                    combined_vertices.append(layer_mesh['vertices'])
-                    faces_with_offset = layer_mesh['faces'] + vertex_offset
-                    combined_faces.append(faces_with_offset)
-                    vertex_offset += len(layer_mesh['vertices'])
-            
-            if combined_vertices:
-                all_vertices = np.vstack(combined_vertices)
-                all_faces = np.vstack(combined_faces)
-                
-                # Simple blue color for all printed material
-                frame_data.append(go.Mesh3d(
-                    x=all_vertices[:, 0],
-                    y=all_vertices[:, 1],
-                    z=all_vertices[:, 2],
-                    i=all_faces[:, 0],
-                    j=all_faces[:, 1],
-                    k=all_faces[:, 2],
-                    color='rgb(70, 130, 220)',  # Clean blue
-                    opacity=0.9,
-                    name='Printed Object',
-                    showscale=False,
-                    hovertemplate=f'Layer {i+1}<br>Height: {current_z:.2f}mm<extra></extra>',
-                    lighting=dict(ambient=0.3, diffuse=0.8, specular=0.1, roughness=0.2)
-                ))
-            
-            # 3. Print head (slower moving, less prominent)
-            nozzle_x = bounds[0][0] + (bounds[1][0] - bounds[0][0]) * 0.8
-            nozzle_y = bounds[0][1] + (bounds[1][1] - bounds[0][1]) * 0.2
+            # 2. Print head (slower moving, less prominent)
             nozzle_z = current_z + 3  # Closer to layer
+            frame_data.append(go.Scatter3d(uid='nozzle', z=[nozzle_z]))
             
-            frame_data.append(go.Scatter3d(
-                x=[nozzle_x],
-                y=[nozzle_y],
-                z=[nozzle_z],
-                mode='markers',
-                marker=dict(
-                    size=8,
-                    color='rgb(150, 150, 150)',
-                    symbol='square',
-                    line=dict(width=1, color='rgb(100, 100, 100)')
-                ),
-                name='Print Head',
-                hovertemplate='Print Head<extra></extra>'
-            ))
-            
-            # 4. Simple progress text
+            # 3. Simple progress text
             progress_text = f"Layer {i+1} / {len(display_layers)}"
             
             frame_data.append(go.Scatter3d(
-                x=[bounds[1][0] + 5],
-                y=[bounds[1][1] + 5],
+                uid='progress',
                 z=[current_z + 2],
-                mode='text',
-                text=[progress_text],
-                textposition='middle center',
-                textfont=dict(size=10, color='rgb(60, 60, 60)'),
-                name='Progress',
-                showlegend=False
+                text=[progress_text]
             ))
             
             # Create frame
             frame = go.Frame(
                 data=frame_data,
+                traces=animated_traces,
                 name=str(i)
             )
             frames.append(frame)
@@ -546,9 +608,32 @@ class FDMVisualizer:
             color='rgb(120, 120, 120)',
             opacity=0.4,
             name='Print Bed',
+            uid='platform',
             showscale=False
         ))
         
+        # Printed layers, hidden until their frame is reached
+        for n, j in enumerate(layer_indices):
+            layer_mesh = layer_meshes[j]
+            initial_data.append(go.Mesh3d(
+                x=layer_mesh.vertices[:, 0],
+                y=layer_mesh.vertices[:, 1],
+                z=layer_mesh.vertices[:, 2],
+                i=layer_mesh.faces[:, 0],
+                j=layer_mesh.faces[:, 1],
+                k=layer_mesh.faces[:, 2],
+                color='rgb(70, 130, 220)',  # Clean blue
+                opacity=0.9,
+                name='Printed Object',
+                uid=f'layer-{j}',
+                legendgroup='printed',
+                showlegend=n == 0,
+                showscale=False,
+                visible=False,
+                hovertemplate=f'Layer {j+1}<br>Height: {z_positions[j]:.2f}mm<extra></extra>',
+                lighting=dict(ambient=0.3, diffuse=0.8, specular=0.1, roughness=0.2)
+            ))
+        
         # Print head at start position
         initial_data.append(go.Scatter3d(
             x=[bounds[0][0] + (bounds[1][0] - bounds[0][0]) * 0.8],
@@ -562,9 +647,24 @@ class FDMVisualizer:
                 line=dict(width=1, color='rgb(100, 100, 100)')
             ),
             name='Print Head',
+            uid='nozzle',
             hovertemplate='Print Head<extra></extra>'
         ))
         
+        # Progress text, filled in by each frame
+        initial_data.append(go.Scatter3d(
+            x=[bounds[1][0] + 5],
+            y=[bounds[1][1] + 5],
+            z=[z_positions[0] + 2],
+            mode='text',
+            text=[''],
+            textposition='middle center',
+            textfont=dict(size=10, color='rgb(60, 60, 60)'),
+            name='Progress',
+            uid='progress',
+            showlegend=False
+        ))
+        
         fig = go.Figure(data=initial_data, frames=frames)
         
         # Simple, clean layout
@@ -578,6 +678,7 @@ class FDMVisualizer:
                 camera=dict(eye=dict(x=1.3, y=1.3, z=1.3))
             ),
             title='3D Printing Process - Layer by Layer Construction',
+            uirevision='fdm-anim',
             updatemenus=[{
                 'type': 'buttons',
                 'showactive': False,
@@ -651,8 +752,11 @@ class FDMVisualizer:
         layer = self.layers[layer_index]
         z_height = layer['z_height']
         
-        # Generate simulated print paths
-        paths = self._generate_print_paths(layer)
+        # Generate simulated print paths (cached so scrubbing back to a layer is instant)
+        paths = self._paths_cache.get(layer_index)
+        if paths is None:
+            paths = self._generate_print_paths(layer)
+            self._paths_cache[layer_index] = paths
         
         fig = go.Figure()
         
@@ -683,7 +787,9 @@ class FDMVisualizer:
         
         # Add layer outline
         if self.mesh:
-            outline = self._get_layer_outline(z_height)
+            if layer_index not in self._outline_cache:
+                self._outline_cache[layer_index] = self._get_layer_outline(z_height)
+            outline = self._outline_cache[layer_index]
             if outline is not None:
                 fig.add_trace(go.Scatter3d(
                     x=outline[:, 0],
@@ -724,6 +830,8 @@ class FDMVisualizer:
         material_data = analysis_results['detailed_analysis']['material_analysis']
         quality_data = analysis_results['detailed_analysis']['quality_analysis']
         
+        from plotly.subplots import make_subplots
+        
         # Create subplots
         fig = make_subplots(
             rows=2, cols=2,
@@ -745,13 +853,13 @@ class FDMVisualizer:
         
         fig.add_trace(go.Pie(
             labels=['Material', 'Machine', 'Labor', 'Energy', 'Failure Risk'],
-            values=[
+            values=np.array([
                 cost_data['material_cost'],
                 cost_data['machine_cost'], 
                 cost_data['labor_cost'],
                 cost_data['energy_cost'],
                 cost_data['failure_cost']
-            ],
+            ], dtype=np.float32),
             name="Cost"
         ), row=1, col=1)
         
@@ -759,12 +867,12 @@ class FDMVisualizer:
         time_breakdown = time_data['breakdown']
         fig.add_trace(go.Bar(
             x=['Print', 'Travel', 'Heating', 'Layer Changes'],
-            y=[
-                time_breakdown['print_time']/60,
-                time_breakdown['travel_time']/60,
-                time_breakdown['heating_time']/60,
-                time_breakdown['layer_change_time']/60
-            ],
+            y=np.array([
+                time_breakdown['print_time'],
+                time_breakdown['travel_time'],
+                time_breakdown['heating_time'],
+                time_breakdown['layer_change_time']
+            ], dtype=np.float32) / 60,
             name="Time (min)"
         ), row=1, col=2)
         
@@ -772,12 +880,12 @@ class FDMVisualizer:
         quality_scores = quality_data['scores']
         fig.add_trace(go.Bar(
             x=['Surface Finish', 'Accuracy', 'Overhang', 'Support Impact'],
-            y=[
+            y=np.array([
                 quality_scores['surface_finish'],
                 quality_scores['dimensional_accuracy'],
                 quality_scores['overhang_quality'],
                 quality_scores['support_impact']
-            ],
+            ], dtype=np.float32),
             name="Quality Score"
         ), row=2, col=1)
         
@@ -785,11 +893,11 @@ class FDMVisualizer:
         material_volumes = material_data['volumes']
         fig.add_trace(go.Pie(
             labels=['Part Material', 'Support Material', 'Waste'],
-            values=[
+            values=np.array([
                 material_volumes['effective_part_volume'],
                 material_volumes['support_volume'],
                 material_volumes['waste_volume']
-            ],
+            ], dtype=np.float32),
             name="Material"
         ), row=2, col=2)
         
@@ -802,11 +910,44 @@ class FDMVisualizer:
         
         return fig
     
-    def save_visualization_html(self, fig: go.Figure, filename: str):
-        """Save visualization as HTML file."""
-        fig.write_html(filename)
+    def save_visualization_html(self, fig: go.Figure, filename: str, include_plotlyjs='cdn'):
+        """
+        Save visualization as HTML file.
+        
+        By default plotly.js is loaded from the CDN instead of being embedded in
+        every file; pass include_plotlyjs=True for a fully offline file.
+        """
+        fig.write_html(filename, include_plotlyjs=include_plotlyjs, full_html=True)
         print(f"Visualization saved to: {filename}")
     
+    def _display_mesh(self, max_faces: Optional[int]) -> trimesh.Trimesh:
+        """Return the mesh decimated to at most max_faces faces, cached per face budget."""
+        if max_faces is None or len(self.mesh.faces) <= max_faces:
+            return self.mesh
+        
+        if max_faces not in self._display_cache:
+            try:
+                display_mesh = self.mesh.simplify_quadric_decimation(face_count=max_faces)
+            except (ImportError, ValueError):
+                # Decimation needs the optional fast_simplification package
+                display_mesh = self.mesh.copy()
+                display_mesh.merge_vertices()
+            self._display_cache[max_faces] = display_mesh
+        
+        return self._display_cache[max_faces]
+    
+    def _get_layer_heat_style(self, current_index: int, layer_index: int) -> Tuple[str, float, str]:
+        """Get color, opacity and label for a printed layer based on how recently it was printed."""
+        # Color progression: early layers are cooler (blue), recent layers are warmer (red)
+        layer_age = (current_index - layer_index) / max(current_index, 1)  # 0 = newest, 1 = oldest
+        
+        if layer_age < 0.1:  # Current layer - bright and warm
+            return 'rgb(255, 100, 50)', 1.0, f'🔥 Layer {layer_index+1} (Just Printed!)'  # Bright orange-red (hot plastic)
+        elif layer_age < 0.3:  # Recent layers - warm
+            return 'rgb(255, 150, 100)', 0.9, f'🌡️ Layer {layer_index+1} (Cooling)'  # Warm orange
+        else:  # Older layers - cooler
+            return 'rgb(100, 150, 255)', 0.8, f'❄️ Layer {layer_index+1} (Solid)'  # Cool blue
+    
     def _extract_support_regions(self, support_data: Dict) -> List:
         """Extract support regions from support analysis data."""
         # This would be implemented based on the support analysis results
@@ -819,44 +960,96 @@ class FDMVisualizer:
             return None
         
         # Generate random support points for demonstration
-        bounds = self.mesh.bounds
+        bounds = self._bounds
         n_points = 100
         
-        x = np.random.uniform(bounds[0][0], bounds[1][0], n_points)
-        y = np.random.uniform(bounds[0][1], bounds[1][1], n_points)
-        z = np.random.uniform(bounds[0][2], bounds[1][2] * 0.8, n_points)
+        points = np.empty((n_points, 3))
+        points[:, 0] = np.random.uniform(bounds[0][0], bounds[1][0], n_points)
+        points[:, 1] = np.random.uniform(bounds[0][1], bounds[1][1], n_points)
+        points[:, 2] = np.random.uniform(bounds[0][2], bounds[1][2] * 0.8, n_points)
         
-        return np.column_stack([x, y, z])
+        return points
     
     def _create_layer_visualization_data(self, z_positions: List[float]) -> Dict:
         """Create visualization data for layers at given Z positions."""
         if not self.mesh:
             return {'x': [], 'y': [], 'z': []}
         
-        bounds = self.mesh.bounds
+        bounds = self._bounds
         points_per_layer = 200
         
-        all_x, all_y, all_z = [], [], []
+        # Generate points within the mesh bounds for every layer at once
+        z_layers = np.asarray(z_positions, dtype=np.float64)
+        n_points = (points_per_layer * (1 - z_layers / bounds[1][2]) + 20).astype(int)  # Fewer points at top
+        n_points = np.maximum(n_points, 0)
+        
+        # Flat index of each point within its own layer, so ragged layers share one array
+        layer_starts = np.cumsum(n_points) - n_points
+        point_layer = np.repeat(np.arange(len(z_layers)), n_points)
+        point_index = np.arange(n_points.sum()) - layer_starts[point_layer]
+        
+        # Create circular pattern for demonstration (same spacing as np.linspace per layer)
+        angles = 2*np.pi * point_index / np.maximum(n_points[point_layer] - 1, 1)
+        radius = min(self._extent[0], self._extent[1]) / 3
+        
+        # Draw uniform(0.3, 1.0) jitter into the reused scratch buffer, growing it only when needed
+        n_total = len(angles)
+        if len(self._jitter_scratch) < 2 * n_total:
+            self._jitter_scratch = np.empty(2 * n_total)
+        jitter = self._jitter_scratch[:2 * n_total]
+        self._rng.random(out=jitter)
+        jitter *= 0.7
+        jitter += 0.3
+        jitter = jitter.reshape(2, n_total)
+        
+        x = bounds[0][0] + self._extent[0]/2 + radius * np.cos(angles) * jitter[0]
+        y = bounds[0][1] + self._extent[1]/2 + radius * np.sin(angles) * jitter[1]
+        z = z_layers[point_layer]
+        
+        return {'x': x, 'y': y, 'z': z}
+    
+    def prime_section_cache(self, z_positions: List[float]):
+        """
+        Slice every height that several views will need in one batched call.
         
-        for z in z_positions:
-            # Generate points within the mesh bounds for this layer
-            n_points = int(points_per_layer * (1 - z / bounds[1][2]) + 20)  # Fewer points at top
-            
-            # Create circular pattern for demonstration
-            angles = np.linspace(0, 2*np.pi, n_points)
-            radius = min(bounds[1][0] - bounds[0][0], bounds[1][1] - bounds[0][1]) / 3
-            
-            x = bounds[0][0] + (bounds[1][0] - bounds[0][0])/2 + radius * np.cos(angles) * np.random.uniform(0.3, 1.0, n_points)
-            y = bounds[0][1] + (bounds[1][1] - bounds[0][1])/2 + radius * np.sin(angles) * np.random.uniform(0.3, 1.0, n_points)
-            z_layer = np.full(n_points, z)
+        Args:
+            z_positions: Z heights the upcoming visualizations will slice at
+        """
+        if self.mesh is None or len(z_positions) == 0:
+            return
+        
+        try:
+            self._section_layers(z_positions)
+        except _SECTION_ERRORS as e:
+            print(f"Warning: Could not pre-slice layers: {e}")
+    
+    def _section_layers(self, z_positions: List[float]) -> List:
+        """
+        Slice the mesh at every Z height, batching heights not already cached.
+        
+        Args:
+            z_positions: List of Z heights to slice at
             
-            all_x.extend(x)
-            all_y.extend(y)
-            all_z.extend(z_layer)
+        Returns:
+            List with a Path2D (or None where the plane misses the mesh) per height.
+            For planes normal to +Z the 2D coordinates are the world X/Y.
+        """
+        keys = [round(float(z), 6) for z in z_positions]
+        missing = sorted({key for key in keys if key not in self._section_cache})
+        
+        # Only heights not sliced before go through the batched call
+        if missing:
+            heights = np.asarray(missing, dtype=np.float64)
+            sections = self.mesh.section_multiplane(
+                plane_origin=[0, 0, heights[0]],
+                plane_normal=[0, 0, 1],
+                heights=heights - heights[0]
+            )
+            self._section_cache.update(zip(missing, sections))
         
-        return {'x': all_x, 'y': all_y, 'z': all_z}
+        return [self._section_cache[key] for key in keys]
     
-    def _create_real_layer_meshes(self, z_positions: List[float]) -> List[Optional[Dict]]:
+    def _create_real_layer_meshes(self, z_positions: List[float]) -> List[Optional[trimesh.Trimesh]]:
         """
         Create actual filled mesh cross-sections for the given Z positions.
         
@@ -864,202 +1057,82 @@ class FDMVisualizer:
             z_positions: List of Z heights to create cross-sections at
             
         Returns:
-            List of mesh data dictionaries or None for each position
+            List of layer meshes or None for each position
         """
         if not self.mesh:
             return [None] * len(z_positions)
         
-        layer_meshes = []
+        try:
+            sections = self._section_layers(z_positions)
+        except _SECTION_ERRORS as e:
+            print(f"Warning: Could not slice layers: {e}")
+            return [None] * len(z_positions)
         
-        for z_height in z_positions:
-            try:
-                # Create cross-section at this height
-                section = self.mesh.section(plane_origin=[0, 0, z_height], plane_normal=[0, 0, 1])
-                
-                if section is not None:
-                    # Handle Path3D objects (common for simple shapes like cubes)
-                    if hasattr(section, 'discrete') and callable(section.discrete):
-                        # Get discretized path points
-                        try:
-                            path_points = section.discrete[0]  # Get first path
-                            if len(path_points) >= 4:  # Need at least 4 points for a closed shape
-                                # Create a simple filled rectangle/polygon
-                                layer_thickness = 0.2
-                                
-                                # Bottom vertices
-                                bottom_vertices = np.column_stack([
-                                    path_points[:, 0],
-                                    path_points[:, 1],
-                                    np.full(len(path_points), z_height - layer_thickness/2)
-                                ])
-                                
-                                # Top vertices  
-                                top_vertices = np.column_stack([
-                                    path_points[:, 0],
-                                    path_points[:, 1],
-                                    np.full(len(path_points), z_height + layer_thickness/2)
-                                ])
-                                
-                                # Combine vertices
-                                vertices = np.vstack([bottom_vertices, top_vertices])
-                                
-                                # Create faces
-                                faces = []
-                                n_vertices = len(path_points)
-                                
-                                # Bottom face (fan triangulation from first vertex)
-                                for i in range(1, n_vertices - 1):
-                                    faces.append([0, i, i + 1])
-                                
-                                # Top face (fan triangulation, reversed)
-                                for i in range(1, n_vertices - 1):
-                                    faces.append([n_vertices, n_vertices + i + 1, n_vertices + i])
-                                
-                                # Side faces
-                                for i in range(n_vertices):
-                                    next_i = (i + 1) % n_vertices
-                                    faces.extend([
-                                        [i, next_i, n_vertices + i],
-                                        [next_i, n_vertices + next_i, n_vertices + i]
-                                    ])
-                                
-                                layer_meshes.append({
-                                    'vertices': vertices,
-                                    'faces': np.array(faces)
-                                })
-                            else:
-                                layer_meshes.append(None)
-                        except:
-                            layer_meshes.append(None)
-                    
-                    # Try to get filled polygon from section
-                    elif hasattr(section, 'polygons_full') and len(section.polygons_full) > 0:
-                        # Use filled polygons for better visualization
-                        combined_vertices = []
-                        combined_faces = []
-                        vertex_offset = 0
-                        
-                        layer_thickness = 0.2  # Thickness for visualization
-                        
-                        for polygon in section.polygons_full:
-                            if len(polygon.vertices) >= 3:
-                                # Bottom vertices
-                                bottom_verts = np.column_stack([
-                                    polygon.vertices[:, 0],
-                                    polygon.vertices[:, 1],
-                                    np.full(len(polygon.vertices), z_height - layer_thickness/2)
-                                ])
-                                
-                                # Top vertices
-                                top_verts = np.column_stack([
-                                    polygon.vertices[:, 0],
-                                    polygon.vertices[:, 1],
-                                    np.full(len(polygon.vertices), z_height + layer_thickness/2)
-                                ])
-                                
-                                # Combine vertices
-                                vertices = np.vstack([bottom_verts, top_verts])
-                                combined_vertices.append(vertices)
-                                
-                                # Create faces for this polygon
-                                n_verts = len(polygon.vertices)
-                                
-                                # Bottom face (triangulated)
-                                for i in range(1, n_verts - 1):
-                                    combined_faces.append([
-                                        vertex_offset,
-                                        vertex_offset + i,
-                                        vertex_offset + i + 1
-                                    ])
-                                
-                                # Top face (triangulated, reversed for correct normal)
-                                for i in range(1, n_verts - 1):
-                                    combined_faces.append([
-                                        vertex_offset + n_verts,
-                                        vertex_offset + n_verts + i + 1,
-                                        vertex_offset + n_verts + i
-                                    ])
-                                
-                                # Side faces
-                                for i in range(n_verts):
-                                    next_i = (i + 1) % n_verts
-                                    
-                                    # Two triangles for each side
-                                    combined_faces.extend([
-                                        [vertex_offset + i, vertex_offset + next_i, vertex_offset + n_verts + i],
-                                        [vertex_offset + next_i, vertex_offset + n_verts + next_i, vertex_offset + n_verts + i]
-                                    ])
-                                
-                                vertex_offset += len(vertices)
-                        
-                        if combined_vertices:
-                            all_vertices = np.vstack(combined_vertices)
-                            all_faces = np.array(combined_faces)
-                            
-                            layer_meshes.append({
-                                'vertices': all_vertices,
-                                'faces': all_faces
-                            })
-                        else:
-                            layer_meshes.append(None)
-                    
-                    # Fallback to outline method if no filled polygons
-                    elif hasattr(section, 'vertices') and len(section.vertices) > 2:
-                        # Create a simple filled layer from outline
-                        layer_thickness = 0.2
-                        
-                        # Bottom vertices
-                        bottom_vertices = np.column_stack([
-                            section.vertices[:, 0],
-                            section.vertices[:, 1],
-                            np.full(len(section.vertices), z_height - layer_thickness/2)
-                        ])
-                        
-                        # Top vertices  
-                        top_vertices = np.column_stack([
-                            section.vertices[:, 0],
-                            section.vertices[:, 1],
-                            np.full(len(section.vertices), z_height + layer_thickness/2)
-                        ])
-                        
-                        # Combine vertices
-                        vertices = np.vstack([bottom_vertices, top_vertices])
-                        
-                        # Create faces
-                        faces = []
-                        n_vertices = len(section.vertices)
-                        
-                        # Bottom face (fan triangulation)
-                        for i in range(1, n_vertices - 1):
-                            faces.append([0, i, i + 1])
-                        
-                        # Top face (fan triangulation, reversed)
-                        for i in range(1, n_vertices - 1):
-                            faces.append([n_vertices, n_vertices + i + 1, n_vertices + i])
-                        
-                        # Side faces
-                        for i in range(n_vertices):
-                            next_i = (i + 1) % n_vertices
-                            faces.extend([
-                                [i, next_i, n_vertices + i],
-                                [next_i, n_vertices + next_i, n_vertices + i]
-                            ])
-                        
-                        layer_meshes.append({
-                            'vertices': vertices,
-                            'faces': np.array(faces)
-                        })
-                    else:
-                        layer_meshes.append(None)
-                else:
-                    layer_meshes.append(None)
-                    
-            except Exception as e:
-                print(f"Warning: Could not create layer mesh at z={z_height}: {e}")
-                layer_meshes.append(None)
+        # Layers are independent, so build them concurrently; the polygon and
+        # array work runs in shapely/numpy code that releases the GIL
+        max_workers = min(len(z_positions), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            layer_meshes = list(executor.map(self._create_layer_mesh, z_positions, sections))
         
         return layer_meshes
     
+    def _create_layer_mesh(self, z_height: float, section) -> Optional[trimesh.Trimesh]:
+        """
+        Create a filled mesh for a single cross-section.
+        
+        Args:
+            z_height: Z height of the cross-section
+            section: Path2D cross-section at that height, or None
+            
+        Returns:
+            Layer mesh, or None if the section has no usable polygons
+        """
+        if section is None:
+            return None
+        
+        layer_thickness = 0.2  # Thickness for visualization
+        
+        try:
+            # Use filled polygons for better visualization;
+            # exterior rings without the repeated closing point
+            outlines = [np.asarray(polygon.exterior.coords)[:-1] for polygon in section.polygons_full]
+        except _SECTION_ERRORS as e:
+            print(f"Warning: Could not create layer mesh at z={z_height}: {e}")
+            return None
+        
+        outlines = [outline for outline in outlines if len(outline) >= 3]
+        if not outlines:
+            return None
+        
+        # One vertex buffer for the whole layer: per polygon, bottom ring then top ring
+        n_total = sum(len(outline) for outline in outlines)
+        vertices = np.empty((2 * n_total, 3))
+        combined_faces = []
+        vertex_offset = 0
+        
+        for outline in outlines:
+            n_verts = len(outline)
+            bottom = slice(vertex_offset, vertex_offset + n_verts)
+            top = slice(vertex_offset + n_verts, vertex_offset + 2 * n_verts)
+            
+            vertices[bottom, :2] = outline[:, :2]
+            vertices[bottom, 2] = z_height - layer_thickness/2
+            vertices[top, :2] = outline[:, :2]
+            vertices[top, 2] = z_height + layer_thickness/2
+            
+            # Create faces for this polygon
+            combined_faces.append(_build_prism_faces(n_verts, vertex_offset))
+            
+            vertex_offset += 2 * n_verts
+        
+        # The slab is built consistently already, so skip trimesh's merge/validation pass
+        return trimesh.Trimesh(
+            vertices=vertices,
+            faces=np.concatenate(combined_faces),
+            process=False,
+            validate=False
+        )
+    
     def _create_layer_outlines(self, z_positions: List[float]) -> Optional[Dict]:
         """
         Create 2D outlines for layers as a fallback visualization.
@@ -1073,47 +1146,47 @@ class FDMVisualizer:
         if not self.mesh:
             return None
         
-        all_x, all_y, all_z = [], [], []
-        
-        for z_height in z_positions:
-            try:
-                # Create cross-section at this height
-                section = self.mesh.section(plane_origin=[0, 0, z_height], plane_normal=[0, 0, 1])
-                
-                if section is not None and hasattr(section, 'vertices'):
-                    # Get the outline vertices
-                    vertices = section.vertices
-                    
-                    if len(vertices) > 0:
-                        # Create outline by connecting vertices
-                        outline_x = vertices[:, 0].tolist()
-                        outline_y = vertices[:, 1].tolist()
-                        outline_z = [z_height] * len(vertices)
-                        
-                        # Close the outline by connecting back to first point
-                        if len(outline_x) > 2:
-                            outline_x.append(outline_x[0])
-                            outline_y.append(outline_y[0])
-                            outline_z.append(z_height)
-                        
-                        all_x.extend(outline_x)
-                        all_y.extend(outline_y)
-                        all_z.extend(outline_z)
-                        
-                        # Add separator (NaN) between different layers
-                        if z_height != z_positions[-1]:
-                            all_x.append(np.nan)
-                            all_y.append(np.nan)
-                            all_z.append(np.nan)
-                        
-            except Exception as e:
-                print(f"Warning: Could not create layer outline at z={z_height}: {e}")
-                continue
+        try:
+            sections = self._section_layers(z_positions)
+        except _SECTION_ERRORS as e:
+            print(f"Warning: Could not slice layer outlines: {e}")
+            return None
         
-        if all_x:
-            return {'x': all_x, 'y': all_y, 'z': all_z}
-        else:
+        # Collect outline vertices per layer, then write everything into one float buffer
+        layer_outlines = [
+            (z_height, section.vertices)
+            for z_height, section in zip(z_positions, sections)
+            if section is not None and len(section.vertices) > 0
+        ]
+        if not layer_outlines:
             return None
+        
+        # Each layer: its vertices, a closing point back to the first (if > 2 vertices),
+        # and a NaN separator unless it is the last layer
+        sizes = [
+            len(vertices) + (len(vertices) > 2) + (z_height != z_positions[-1])
+            for z_height, vertices in layer_outlines
+        ]
+        out = np.empty((sum(sizes), 3), dtype=np.float64)
+        
+        start = 0
+        for (z_height, vertices), size in zip(layer_outlines, sizes):
+            n = len(vertices)
+            out[start:start + n, :2] = vertices[:, :2]
+            out[start:start + n, 2] = z_height
+            
+            # Close the outline by connecting back to first point
+            if n > 2:
+                out[start + n] = out[start]
+                n += 1
+            
+            # Add separator (NaN) between different layers
+            if n < size:
+                out[start + n] = np.nan
+            
+            start += size
+        
+        return {'x': out[:, 0], 'y': out[:, 1], 'z': out[:, 2]}
     
     def _generate_print_paths(self, layer: Dict) -> Dict:
         """Generate simulated print paths for a layer."""
@@ -1121,28 +1194,30 @@ class FDMVisualizer:
             return {}
         
         z_height = layer['z_height']
-        bounds = self.mesh.bounds
+        bounds = self._bounds
         
         paths = {}
         
         # Generate perimeter path (simplified rectangular)
-        perimeter_x = [bounds[0][0], bounds[1][0], bounds[1][0], bounds[0][0], bounds[0][0]]
-        perimeter_y = [bounds[0][1], bounds[0][1], bounds[1][1], bounds[1][1], bounds[0][1]]
-        perimeter_z = [z_height] * 5
+        perimeter = np.empty((5, 3), dtype=np.float32)
+        perimeter[:, 0] = [bounds[0][0], bounds[1][0], bounds[1][0], bounds[0][0], bounds[0][0]]
+        perimeter[:, 1] = [bounds[0][1], bounds[0][1], bounds[1][1], bounds[1][1], bounds[0][1]]
+        perimeter[:, 2] = z_height
         
-        paths['perimeter'] = np.column_stack([perimeter_x, perimeter_y, perimeter_z])
+        paths['perimeter'] = perimeter
         
-        # Generate infill paths (simple grid)
+        # Generate infill paths (simple grid), one line per x position from y min to y max
         n_lines = 5
-        infill_x, infill_y, infill_z = [], [], []
+        spacing = self._extent[0] / (n_lines + 1)
+        x_positions = np.linspace(bounds[0][0] + spacing, bounds[1][0] - spacing, n_lines)
         
-        for i in range(n_lines):
-            x_pos = bounds[0][0] + (bounds[1][0] - bounds[0][0]) * (i + 1) / (n_lines + 1)
-            infill_x.extend([x_pos, x_pos])
-            infill_y.extend([bounds[0][1], bounds[1][1]])
-            infill_z.extend([z_height, z_height])
+        infill = np.empty((2 * n_lines, 3), dtype=np.float32)
+        infill[:, 0] = np.repeat(x_positions, 2)
+        infill[0::2, 1] = bounds[0][1]
+        infill[1::2, 1] = bounds[1][1]
+        infill[:, 2] = z_height
         
-        paths['infill'] = np.column_stack([infill_x, infill_y, infill_z])
+        paths['infill'] = infill
         
         return paths
     
@@ -1151,22 +1226,47 @@ class FDMVisualizer:
         if not self.mesh:
             return None
         
+        # Reuse a section already taken at this height by another view
+        key = round(float(z_height), 6)
+        if key in self._section_cache:
+            return self._section_outline(self._section_cache[key], z_height)
+        
+        # Only faces whose bounding box spans this height can intersect the plane;
+        # the mesh's cached AABB tree finds them without testing every face
+        bounds = self._bounds
         try:
-            # Create cross-section
-            section = self.mesh.section(plane_origin=[0, 0, z_height], plane_normal=[0, 0, 1])
+            try:
+                candidate_faces = np.fromiter(
+                    self.mesh.triangles_tree.intersection(
+                        (bounds[0][0], bounds[0][1], z_height, bounds[1][0], bounds[1][1], z_height)
+                    ),
+                    dtype=np.int64
+                )
+            except ImportError:
+                # rtree is optional; without it the whole mesh is sectioned
+                candidate_faces = None
+            if candidate_faces is not None and len(candidate_faces) == 0:
+                return None
             
-            if section is not None and hasattr(section, 'vertices'):
-                # Add Z coordinate
-                outline = np.column_stack([
-                    section.vertices[:, 0],
-                    section.vertices[:, 1],
-                    np.full(len(section.vertices), z_height)
-                ])
-                return outline
-        except:
-            pass
-        
-        return None
+            # Create cross-section
+            section = self.mesh.section(plane_origin=[0, 0, z_height], plane_normal=[0, 0, 1],
+                                        local_faces=candidate_faces)
+        except _SECTION_ERRORS:
+            return None
+        
+        return self._section_outline(section, z_height)
+    
+    @staticmethod
+    def _section_outline(section, z_height: float) -> Optional[np.ndarray]:
+        """Lift a section's X/Y vertices to an (N, 3) outline at the given Z height."""
+        if section is None or not hasattr(section, 'vertices'):
+            return None
+        
+        vertices = section.vertices
+        outline = np.empty((len(vertices), 3))
+        outline[:, :2] = vertices[:, :2]
+        outline[:, 2] = z_height
+        return outline
 
 
 def create_interactive_visualization_app(simulator, file_path: str):
@@ -1195,16 +1295,26 @@ def create_interactive_visualization_app(simulator, file_path: str):
         results['detailed_analysis']['geometry']['overhang_analysis']
     )
     
+    # Slice every height the animation and print path views share in one pass,
+    # so each view below reads its sections from the visualizer's cache
+    animation_layers = 20
+    path_layer_index = len(simulator.layers) // 2
+    all_needed_zs = [layer['z_height'] for layer in simulator.layers[:animation_layers]]
+    if simulator.layers:
+        all_needed_zs.append(simulator.layers[path_layer_index]['z_height'])
+    z_master = np.unique(np.round(all_needed_zs, 6))
+    visualizer.prime_section_cache(z_master)
+    
     # Generate visualizations
     print("Generating 3D mesh view...")
     mesh_fig = visualizer.create_3d_mesh_view()
     
     print("Generating layer animation...")
-    animation_fig = visualizer.create_layer_by_layer_animation(max_layers=20)
+    animation_fig = visualizer.create_layer_by_layer_animation(max_layers=animation_layers)
     
     print("Generating print path visualization...")
     if simulator.layers:
-        path_fig = visualizer.create_print_path_visualization(len(simulator.layers)//2)
+        path_fig = visualizer.create_print_path_visualization(path_layer_index)
     else:
         path_fig = None
     
@@ -5,14 +5,21 @@ Interactive Streamlit web application for FDM simulation with visual feedback.
 """
 
 import streamlit as st
-import tempfile
-import os
+import io
 import json
+import hashlib
+from typing import Dict, Optional
 from fdm_simulation import FDMSimulator
 from fdm_visualization import FDMVisualizer, create_interactive_visualization_app
-import plotly.graph_objects as go
 import time
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    # orjson is optional; the standard json module is used instead
+    ORJSON_AVAILABLE = False
+
 # Page configuration
 st.set_page_config(
     page_title="FDM Simulation & Visualization",
@@ -38,6 +45,144 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def _config_key(config: Dict) -> tuple:
+    """Hashable, order-independent form of a simulator config for cache keys."""
+    return tuple(sorted(config.items()))
+
+
+def load_simulator(file_hash: str, config_key: tuple, file_buffer: memoryview,
+                   file_name: str = 'uploaded.stl') -> Optional[FDMSimulator]:
+    """
+    Load an uploaded STL into a simulator, once per file content and configuration for this session.
+    
+    The simulator writes its layers and results while analyzing, so it lives in
+    st.session_state rather than in a cache shared by every session. The STL
+    is parsed straight from memory, copying the upload only when the file or
+    config changes.
+    """
+    key = (file_hash, config_key)
+    if st.session_state.get('simulator_key') != key:
+        simulator = FDMSimulator(dict(config_key))
+        st.session_state.loaded_simulator = (
+            simulator if simulator.load_stl(io.BytesIO(file_buffer), file_name) else None
+        )
+        st.session_state.simulator_key = key
+    return st.session_state.loaded_simulator
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def run_simulation(file_hash: str, config_key: tuple, _simulator: FDMSimulator) -> Dict:
+    """Run the complete analysis, once per file content and configuration."""
+    return _simulator.run_complete_analysis()
+
+
+def load_visualizer(file_hash: str, config_key: tuple, simulator: FDMSimulator,
+                    results: Dict) -> FDMVisualizer:
+    """
+    Build the visualizer once per simulation for this session, keeping its slicing caches across reruns.
+    
+    The visualizer keeps mutable state (animation state, section and path
+    caches, the jitter buffer), so it lives in st.session_state rather than in
+    a cache shared by every session.
+    """
+    key = (file_hash, config_key)
+    if st.session_state.get('visualizer_key') != key:
+        visualizer = FDMVisualizer()
+        visualizer.load_mesh_data(
+            simulator.mesh,
+            simulator.layers,
+            results['detailed_analysis']['geometry']['overhang_analysis']
+        )
+        st.session_state.visualizer = visualizer
+        st.session_state.visualizer_key = key
+    return st.session_state.visualizer
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_figure(file_hash: str, config_key: tuple, view: str, option,
+                 _visualizer: FDMVisualizer, _results: Dict) -> Dict:
+    """
+    Build one of the visualization figures, reused until the file, config or view option changes.
+    
+    The figure is cached as its plain dict, so every session gets its own copy.
+    
+    Args:
+        view: 'mesh', 'animation', 'paths' or 'dashboard'
+        option: show_supports, max_layers or layer index for the view (None for the dashboard)
+    """
+    if view == 'mesh':
+        fig = _visualizer.create_3d_mesh_view(show_supports=option)
+    elif view == 'animation':
+        fig = _visualizer.create_educational_printing_animation(max_layers=option)
+    elif view == 'paths':
+        fig = _visualizer.create_print_path_visualization(option)
+    elif view == 'dashboard':
+        fig = _visualizer.create_printing_analytics_dashboard(_results)
+    else:
+        raise ValueError(f"Unknown view: {view}")
+    return fig.to_dict()
+
+
+def _to_json(data) -> bytes:
+    """Serialize export data as indented JSON, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_complete_export(file_hash: str, config_key: tuple, _results: Dict) -> bytes:
+    """Serialize the complete analysis export, the large one, once per file content and configuration."""
+    return _to_json(_results)
+
+
+def build_export(file_hash: str, config_key: tuple, kind: str, file_name: str,
+                 analysis_time: float, timestamp: float, results: Dict,
+                 simulator: FDMSimulator) -> bytes:
+    """
+    Serialize one of the export downloads.
+    
+    The small exports are rebuilt on each render so they carry the current
+    timestamp; only the complete analysis, which has no timestamp, is cached.
+    
+    Args:
+        kind: 'rl_metrics', 'complete' or 'training_sample'
+        timestamp: time stamped into the rl_metrics and training_sample exports
+    """
+    if kind == 'rl_metrics':
+        data = {
+            **results['rl_metrics'],
+            'file_name': file_name,
+            'analysis_timestamp': timestamp
+        }
+    elif kind == 'complete':
+        return build_complete_export(file_hash, config_key, results)
+    elif kind == 'training_sample':
+        config = dict(config_key)
+        data = {
+            'input_features': {
+                'volume': simulator.mesh.volume,
+                'surface_area': simulator.mesh.area,
+                'layer_height': config['layer_height'],
+                'print_speed': config['print_speed'],
+                'material_cost_per_kg': config['material_cost_per_kg']
+            },
+            'target_metrics': results['rl_metrics'],
+            'metadata': {
+                'file_name': file_name,
+                'analysis_time': analysis_time,
+                'timestamp': timestamp
+            }
+        }
+    else:
+        raise ValueError(f"Unknown export: {kind}")
+    return _to_json(data)
+
+
 def main():
     """Main Streamlit application."""
     
@@ -91,51 +236,61 @@ def main():
         uploaded_file = st.file_uploader("Choose an STL file", type=['stl', 'STL'])
         
         if uploaded_file is not None:
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.stl') as tmp_file:
-                tmp_file.write(uploaded_file.read())
-                tmp_path = tmp_file.name
+            # Key the caches on the file content and config, so reruns from widget
+            # changes reuse the loaded mesh and analysis instead of redoing them.
+            # getbuffer() is a view of the upload, so reruns hash it without a copy.
+            file_buffer = uploaded_file.getbuffer()
+            file_hash = hashlib.blake2b(file_buffer, digest_size=16).hexdigest()
+            config_key = _config_key(custom_config)
             
             try:
-                # Initialize simulator
-                if 'simulator' not in st.session_state:
-                    st.session_state.simulator = FDMSimulator(custom_config)
-                
                 # Load mesh
                 with st.spinner("Loading STL file..."):
-                    if st.session_state.simulator.load_stl(tmp_path):
-                        st.success("✅ STL file loaded successfully!")
-                        
-                        # Display mesh info
-                        mesh = st.session_state.simulator.mesh
-                        col_a, col_b = st.columns(2)
-                        with col_a:
-                            st.metric("Vertices", f"{len(mesh.vertices):,}")
-                            st.metric("Volume", f"{mesh.volume:.1f} mm³")
-                        with col_b:
-                            st.metric("Faces", f"{len(mesh.faces):,}")
-                            st.metric("Watertight", "Yes" if mesh.is_watertight else "No")
+                    simulator = load_simulator(file_hash, config_key, file_buffer, uploaded_file.name)
+                
+                st.session_state.cache_key = (file_hash, config_key)
+                if simulator is not None:
+                    st.session_state.simulator = simulator
+                    st.success("✅ STL file loaded successfully!")
+                    
+                    # Display mesh info
+                    mesh = simulator.mesh
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        st.metric("Vertices", f"{len(mesh.vertices):,}")
+                        st.metric("Volume", f"{mesh.volume:.1f} mm³")
+                    with col_b:
+                        st.metric("Faces", f"{len(mesh.faces):,}")
+                        st.metric("Watertight", "Yes" if mesh.is_watertight else "No")
+                else:
+                    st.error("Could not load a valid mesh from this STL file")
+                
+                # Results shown below must belong to the current file and config
+                if st.session_state.get('results_key') != st.session_state.get('cache_key'):
+                    st.session_state.pop('results', None)
                 
                 # Run simulation button
-                if st.button("🚀 Run Complete Simulation", type="primary"):
+                if simulator is not None and st.button("🚀 Run Complete Simulation", type="primary"):
                     with st.spinner("Running FDM simulation..."):
                         start_time = time.time()
                         
-                        # Run complete analysis
-                        results = st.session_state.simulator.run_complete_analysis()
+                        # Run complete analysis (instant if this file and config ran before)
+                        results = run_simulation(file_hash, config_key, simulator)
+                        
+                        # Cached results may come from another session's run, which
+                        # sliced that session's simulator; re-slice so the layer views have data
+                        if not simulator.layers:
+                            simulator.slice_mesh()
                         
                         # Store results
                         st.session_state.results = results
+                        st.session_state.results_key = (file_hash, config_key)
                         st.session_state.analysis_time = time.time() - start_time
                         
                         st.success(f"✅ Simulation complete! ({st.session_state.analysis_time:.1f}s)")
                 
             except Exception as e:
                 st.error(f"Error processing file: {str(e)}")
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
     
     with col2:
         if 'results' in st.session_state:
@@ -189,13 +344,11 @@ def main():
     if 'results' in st.session_state and 'simulator' in st.session_state:
         st.header("🎥 3D Visualization")
         
-        # Create visualizer
-        visualizer = FDMVisualizer()
-        visualizer.load_mesh_data(
-            st.session_state.simulator.mesh,
-            st.session_state.simulator.layers,
-            st.session_state.results['detailed_analysis']['geometry']['overhang_analysis']
-        )
+        # Visualizer and figures are cached per file and config, so slider and
+        # checkbox changes elsewhere on the page reuse them
+        file_hash, config_key = st.session_state.results_key
+        results = st.session_state.results
+        visualizer = load_visualizer(file_hash, config_key, st.session_state.simulator, results)
         
         # Visualization tabs
         tab1, tab2, tab3, tab4 = st.tabs(["3D Mesh View", "Layer Animation", "Print Paths", "Analytics"])
@@ -203,7 +356,7 @@ def main():
         with tab1:
             st.subheader("3D Mesh with Support Structures")
             try:
-                mesh_fig = visualizer.create_3d_mesh_view(show_supports=show_supports)
+                mesh_fig = build_figure(file_hash, config_key, 'mesh', show_supports, visualizer, results)
                 st.plotly_chart(mesh_fig, use_container_width=True)
             except Exception as e:
                 st.error(f"Error creating 3D mesh view: {e}")
@@ -212,7 +365,8 @@ def main():
             st.subheader("🎓 Educational 3D Printing Animation")
             st.markdown("**See how 3D printing works step by step!**")
             try:
-                animation_fig = visualizer.create_educational_printing_animation(max_layers=max_animation_layers)
+                animation_fig = build_figure(file_hash, config_key, 'animation', max_animation_layers,
+                                             visualizer, results)
                 st.plotly_chart(animation_fig, use_container_width=True)
                 st.info("🎬 **How to watch:** Press '▶️ Start Printing' to see the layer-by-layer process. Notice how hot plastic (orange/red) is extruded and cools down (blue)!")
                 
@@ -239,7 +393,7 @@ def main():
                     len(st.session_state.simulator.layers)//2
                 )
                 try:
-                    path_fig = visualizer.create_print_path_visualization(layer_selector)
+                    path_fig = build_figure(file_hash, config_key, 'paths', layer_selector, visualizer, results)
                     st.plotly_chart(path_fig, use_container_width=True)
                 except Exception as e:
                     st.error(f"Error creating print path view: {e}")
@@ -249,7 +403,7 @@ def main():
         with tab4:
             st.subheader("Analytics Dashboard")
             try:
-                dashboard_fig = visualizer.create_printing_analytics_dashboard(st.session_state.results)
+                dashboard_fig = build_figure(file_hash, config_key, 'dashboard', None, visualizer, results)
                 st.plotly_chart(dashboard_fig, use_container_width=True)
             except Exception as e:
                 st.error(f"Error creating dashboard: {e}")
@@ -260,57 +414,41 @@ def main():
         
         col_export1, col_export2, col_export3 = st.columns(3)
         
+        # The complete analysis is serialized once per analysis and reused on
+        # later reruns; the small exports are stamped with this render's time
+        file_hash, config_key = st.session_state.results_key
+        export_name = uploaded_file.name if uploaded_file else 'unknown'
+        analysis_time = st.session_state.analysis_time
+        results = st.session_state.results
+        simulator = st.session_state.simulator
+        now = time.time()
+        
         with col_export1:
-            if st.button("📄 Download RL Metrics (JSON)"):
-                rl_data = st.session_state.results['rl_metrics']
-                rl_data['file_name'] = uploaded_file.name if uploaded_file else 'unknown'
-                rl_data['analysis_timestamp'] = time.time()
-                
-                json_str = json.dumps(rl_data, indent=2)
-                st.download_button(
-                    label="Download JSON",
-                    data=json_str,
-                    file_name=f"fdm_rl_metrics_{int(time.time())}.json",
-                    mime="application/json"
-                )
+            st.download_button(
+                label="📄 Download RL Metrics (JSON)",
+                data=build_export(file_hash, config_key, 'rl_metrics', export_name, analysis_time, now,
+                                  results, simulator),
+                file_name=f"fdm_rl_metrics_{int(now)}.json",
+                mime="application/json"
+            )
         
         with col_export2:
-            if st.button("📊 Download Complete Analysis"):
-                complete_data = st.session_state.results
-                json_str = json.dumps(complete_data, indent=2, default=str)
-                st.download_button(
-                    label="Download Complete Analysis",
-                    data=json_str,
-                    file_name=f"fdm_complete_analysis_{int(time.time())}.json",
-                    mime="application/json"
-                )
+            st.download_button(
+                label="📊 Download Complete Analysis",
+                data=build_export(file_hash, config_key, 'complete', export_name, analysis_time, now,
+                                  results, simulator),
+                file_name=f"fdm_complete_analysis_{int(now)}.json",
+                mime="application/json"
+            )
         
         with col_export3:
-            if st.button("🎯 Generate Training Sample"):
-                # Create formatted training sample
-                training_sample = {
-                    'input_features': {
-                        'volume': st.session_state.simulator.mesh.volume,
-                        'surface_area': st.session_state.simulator.mesh.area,
-                        'layer_height': custom_config['layer_height'],
-                        'print_speed': custom_config['print_speed'],
-                        'material_cost_per_kg': custom_config['material_cost_per_kg']
-                    },
-                    'target_metrics': st.session_state.results['rl_metrics'],
-                    'metadata': {
-                        'file_name': uploaded_file.name if uploaded_file else 'unknown',
-                        'analysis_time': st.session_state.analysis_time,
-                        'timestamp': time.time()
-                    }
-                }
-                
-                json_str = json.dumps(training_sample, indent=2)
-                st.download_button(
-                    label="Download Training Sample",
-                    data=json_str,
-                    file_name=f"fdm_training_sample_{int(time.time())}.json",
-                    mime="application/json"
-                )
+            st.download_button(
+                label="🎯 Download Training Sample",
+                data=build_export(file_hash, config_key, 'training_sample', export_name, analysis_time, now,
+                                  results, simulator),
+                file_name=f"fdm_training_sample_{int(now)}.json",
+                mime="application/json"
+            )
     
     # Footer
     st.markdown("---")
@@ -208,7 +208,8 @@ if 'analysis_complete' in st.session_state and st.session_state['analysis_comple
     fig = create_3d_visualization(
         st.session_state['mesh'],
         st.session_state['problem_regions'],
-        st.session_state['score']
+        st.session_state['score'],
+        cache=st.session_state['analyzer'].get_mesh_cache()
     )
     
     st.plotly_chart(fig, use_container_width=True)
@@ -6,6 +6,7 @@ from small_features_check import analyze_small_features
 from steep_walls_check import analyze_steep_walls
 from narrow_channels_check import analyze_narrow_channels
 from deep_pockets_check import analyze_deep_pockets
+from mesh_utils import MeshCache
 
 class CNCAnalyzer:
     """Main analyzer class for CNC manufacturability."""
@@ -19,6 +20,7 @@ class CNCAnalyzer:
         """
         self.config = config or self.get_default_config()
         self.results = {}
+        self._mesh_cache = None
         
     @staticmethod
     def get_default_config():
@@ -49,6 +51,14 @@ class CNCAnalyzer:
             print(f"Error loading file: {e}")
             return False
     
+    def get_mesh_cache(self):
+        """Per-face geometry snapshot of the current mesh, rebuilt if the mesh was replaced."""
+        # trimesh.load already merges the duplicated STL vertices, so the
+        # snapshot is taken from the indexed mesh
+        if self._mesh_cache is None or self._mesh_cache.mesh is not self.mesh:
+            self._mesh_cache = MeshCache(self.mesh)
+        return self._mesh_cache
+    
     def analyze_single_function(self, function_name):
         """Analyze using a single function."""
         if not hasattr(self, 'mesh'):
@@ -59,37 +69,43 @@ class CNCAnalyzer:
         if function_name == 'undercuts':
             results = analyze_undercuts(
                 self.mesh, 
-                use_context=self.config['use_context_aware']
+                use_context=self.config['use_context_aware'],
+                cache=self.get_mesh_cache()
             )
         elif function_name == 'internal_volumes':
             results = analyze_internal_volumes(
                 self.mesh,
-                use_context=self.config['use_context_aware']
+                use_context=self.config['use_context_aware'],
+                cache=self.get_mesh_cache()
             )
         elif function_name == 'small_features':
             results = analyze_small_features(
                 self.mesh,
                 min_tool_diameter=self.config['min_tool_diameter'],
-                use_realistic=True
+                use_realistic=True,
+                cache=self.get_mesh_cache()
             )
         elif function_name == 'steep_walls':
             results = analyze_steep_walls(
                 self.mesh,
                 angle_threshold=self.config['steep_angle_threshold'],
                 min_depth=self.config['min_depth'],
-                use_context=self.config['use_context_aware']
+                use_context=self.config['use_context_aware'],
+                cache=self.get_mesh_cache()
             )
         elif function_name == 'narrow_channels':
             results = analyze_narrow_channels(
                 self.mesh,
                 min_channel_width=self.config['min_channel_width'],
-                use_context=self.config['use_context_aware']
+                use_context=self.config['use_context_aware'],
+                cache=self.get_mesh_cache()
             )
         elif function_name == 'deep_pockets':
             results = analyze_deep_pockets(
                 self.mesh,
                 depth_threshold=self.config['deep_pocket_threshold'],
-                method='ray'
+                method='ray',
+                cache=self.get_mesh_cache()
             )
         else:
             raise ValueError(f"Unknown function: {function_name}")
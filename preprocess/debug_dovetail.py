@@ -4,76 +4,74 @@ sys.path.append('preprocess')
 import trimesh
 import numpy as np
 from undercut_check import find_undercuts
-from geometric_context import analyze_face_context
+from geometric_context import analyze_faces_context_batch
 
-# Load the dovetail joint STL
-mesh_path = "testcases/undercut/dovetail_joint_red.stl"
-mesh = trimesh.load(mesh_path)
+def format_context_table(mesh, face_indices, context):
+    """Format the context of the given faces as one table, a row per face."""
+    face_indices = np.asarray(face_indices, dtype=np.int64)
+    centers = mesh.triangles_center[face_indices]
+    normals = mesh.face_normals[face_indices]
 
-print(f"Debugging dovetail joint undercut detection...")
-print(f"Mesh bounds: {mesh.bounds}")
+    # This is the condition used in context_aware_undercuts
+    is_undercut = ~context['has_tool_access'] & ~context['is_external']
 
-# Get basic undercuts first
-basic_undercuts = find_undercuts(mesh)
-print(f"Basic detection found {len(basic_undercuts)} undercut faces")
+    header = f"{'Face':>8}  {'Center':^30}  {'Normal':^24}  {'External':>8}  {'Access':>6}  {'Deep':>5}  {'Area':>10}  {'Undercut':>8}"
+    rows = [header, '-' * len(header)]
+    for row in zip(face_indices, centers, normals, context['is_external'], context['has_tool_access'],
+                   context['is_deep'], context['face_area'], is_undercut):
+        face_idx, center, normal, external, access, deep, area, undercut = row
+        rows.append(
+            f"{face_idx:>8}  {np.array2string(center, precision=3):^30}  {np.array2string(normal, precision=3):^24}  "
+            f"{str(external):>8}  {str(access):>6}  {str(deep):>5}  {area:>10.6f}  {str(undercut):>8}"
+        )
+    return "\n".join(rows)
 
-# Sample some of the basic undercut faces and analyze their context
-sample_indices = basic_undercuts[:10] if len(basic_undercuts) > 10 else basic_undercuts
+def main():
+    # Load the dovetail joint STL
+    mesh_path = "testcases/undercut/dovetail_joint_red.stl"
+    mesh = trimesh.load(mesh_path)
 
-print(f"\nAnalyzing context for sample undercut faces:")
-for i, face_idx in enumerate(sample_indices):
-    face_center = mesh.triangles_center[face_idx]
-    face_normal = mesh.face_normals[face_idx]
-    
+    print(f"Debugging dovetail joint undercut detection...")
+    print(f"Mesh bounds: {mesh.bounds}")
+
+    # Get basic undercuts first
+    basic_undercuts = find_undercuts(mesh)
+    print(f"Basic detection found {len(basic_undercuts)} undercut faces")
+
+    # Sample some of the basic undercut faces and analyze their context
+    sample_indices = basic_undercuts[:10]
+
+    print(f"\nAnalyzing context for sample undercut faces:")
     try:
-        context = analyze_face_context(face_idx, mesh)
-        print(f"\nFace {face_idx}:")
-        print(f"  Center: {face_center}")
-        print(f"  Normal: {face_normal}")
-        print(f"  Is external: {context['is_external']}")
-        print(f"  Has tool access: {context['has_tool_access']}")
-        print(f"  Is deep: {context['is_deep']}")
-        print(f"  Face area: {context['face_area']:.6f}")
-        
-        # This is the condition used in context_aware_undercuts
-        is_undercut = not context['has_tool_access'] and not context['is_external']
-        print(f"  Would be flagged as undercut: {is_undercut}")
-        
+        context = analyze_faces_context_batch(sample_indices, mesh)
+        print(format_context_table(mesh, sample_indices, context))
     except Exception as e:
-        print(f"  Error analyzing face {face_idx}: {e}")
+        print(f"  Error analyzing sample faces: {e}")
 
-# Let's also check some faces that should be dovetail undercuts
-# Look for faces with specific characteristics
-face_normals = mesh.face_normals
-face_centers = mesh.triangles_center
+    # Let's also check some faces that should be dovetail undercuts
+    # Look for faces with specific characteristics
+    face_normals = mesh.face_normals
+    face_centers = mesh.triangles_center
 
-print(f"\nLooking for dovetail characteristics...")
-print(f"Total faces: {len(mesh.faces)}")
+    print(f"\nLooking for dovetail characteristics...")
+    print(f"Total faces: {len(mesh.faces)}")
 
-# Look for faces that point inward and are not on the boundary
-inward_faces = []
-for i, (center, normal) in enumerate(zip(face_centers, face_normals)):
-    # Check if face is in the middle region where dovetail undercuts would be
-    if -10 < center[0] < 30 and -15 < center[1] < -5 and 0.5 < center[2] < 3.5:
-        # Check if normal points inward (negative X direction for dovetail)
-        if normal[0] < -0.5:  # Points toward negative X
-            inward_faces.append(i)
+    # Faces in the middle region where dovetail undercuts would be, whose
+    # normal points inward (negative X direction for dovetail)
+    in_region = ((face_centers[:, 0] > -10) & (face_centers[:, 0] < 30) &
+                 (face_centers[:, 1] > -15) & (face_centers[:, 1] < -5) &
+                 (face_centers[:, 2] > 0.5) & (face_centers[:, 2] < 3.5))
+    inward_faces = np.flatnonzero(in_region & (face_normals[:, 0] < -0.5))
 
-print(f"Found {len(inward_faces)} faces that might be dovetail undercuts")
+    print(f"Found {len(inward_faces)} faces that might be dovetail undercuts")
 
-# Analyze a few of these
-for i, face_idx in enumerate(inward_faces[:5]):
-    face_center = mesh.triangles_center[face_idx]
-    face_normal = mesh.face_normals[face_idx]
-    
+    # Analyze a few of these
+    print(f"\nPotential dovetail faces:")
     try:
-        context = analyze_face_context(face_idx, mesh)
-        print(f"\nPotential dovetail face {face_idx}:")
-        print(f"  Center: {face_center}")
-        print(f"  Normal: {face_normal}")
-        print(f"  Is external: {context['is_external']}")
-        print(f"  Has tool access: {context['has_tool_access']}")
-        print(f"  Is deep: {context['is_deep']}")
-        
+        context = analyze_faces_context_batch(inward_faces[:5], mesh)
+        print(format_context_table(mesh, inward_faces[:5], context))
     except Exception as e:
-        print(f"  Error analyzing face {face_idx}: {e}")
\ No newline at end of file
+        print(f"  Error analyzing potential dovetail faces: {e}")
+
+if __name__ == '__main__':
+    main()
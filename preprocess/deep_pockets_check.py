@@ -1,5 +1,6 @@
 import numpy as np
 import trimesh
+from mesh_utils import MeshCache, first_ray_distances, ray_exit_distances
 
 # def estimate_pocket_depth(mesh, center, normal):
 #     """Estimate the depth of pockets at a specific face using ray casting."""
@@ -20,44 +21,57 @@ import trimesh
 #     except:
 #         return 0
 
-def estimate_pocket_depth(mesh, center, normal):
-    """More robust depth estimation with error handling"""
+def estimate_pocket_depths(mesh, centers, normals):
+    """
+    Estimate pocket depth for many faces with batched ray queries.
+    
+    Args:
+        mesh: trimesh object
+        centers: (N, 3) face centers
+        normals: (N, 3) face normals
+    
+    Returns:
+        np.ndarray: (N,) depths, 0 where the ray escapes or the hit is negligibly close
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    if len(centers) == 0:
+        return np.zeros(0)
+    
     try:
-        # Normalize the direction vector
-        direction = normal / (np.linalg.norm(normal) + 1e-10)
-        
-        # Add small offset to avoid self-intersection
-        ray_origin = center + direction * 0.01
-        
-        with np.errstate(invalid='ignore'):  # Suppress runtime warnings
-            locations, _, _ = mesh.ray.intersects_location(
-                ray_origins=[ray_origin],
-                ray_directions=[direction],
-                multiple_hits=False
-            )
+        # Normalize the direction vectors
+        directions = normals / (np.linalg.norm(normals, axis=1, keepdims=True) + 1e-10)
         
-        if len(locations) > 0:
-            depth = np.linalg.norm(locations[0] - center)
-            return depth if depth > 0.1 else 0  # Ignore tiny depths
-        
-        return 0
+        # Add small offset to avoid self-intersection, then add it back so
+        # depths are measured from the face center
+        depths = first_ray_distances(mesh, centers + directions * 0.01, directions) + 0.01
+        return np.where(depths > 0.1, depths, 0)  # Ignore misses (NaN) and tiny depths
     except Exception:
-        return 0
+        return np.zeros(len(centers))
+
+def estimate_pocket_depth(mesh, center, normal):
+    """More robust depth estimation with error handling"""
+    return estimate_pocket_depths(mesh, [center], [normal])[0]
     
-def find_deep_pockets(mesh, depth_threshold=30.0, method='ray'):
+def find_deep_pockets(mesh, depth_threshold=30.0, method='ray', cache=None):
     """
     Find faces in deep pockets that may cause machining issues.
     
+    With the ray method, duplicate faces take the depth of their first copy
+    and zero-area faces are never deep.
+    
     Args:
         mesh: trimesh object
         depth_threshold: minimum depth to consider problematic
         method: 'ray' for ray casting, 'normal' for normal analysis
+        cache: MeshCache for this mesh, built on demand if not given
     
     Returns:
         tuple: (face_indices, metadata)
     """
-    face_centers = mesh.triangles_center
-    face_normals = mesh.face_normals
+    cache = cache or MeshCache(mesh)
+    face_centers = cache.centers
+    face_normals = cache.normals
     
     result = {
         'method': method,
@@ -70,19 +84,24 @@ def find_deep_pockets(mesh, depth_threshold=30.0, method='ray'):
     
     try:
         if method == 'ray':
-            deep_faces = []
-            max_depth = 0
+            # One ray per surface face, cast in a single batch; duplicate faces
+            # take their twin's depth and zero-area faces get depth 0
+            surface = cache.surface_faces
+            
+            # A face whose ray leaves the mesh bounds within the threshold cannot
+            # be deep whatever it hits, so only the remaining faces are cast
+            exits = ray_exit_distances(face_centers[surface], face_normals[surface], cache.bounds)
+            candidates = surface[exits > depth_threshold - 1e-6]
             
-            for i, (center, normal) in enumerate(zip(face_centers, face_normals)):
-                depth = estimate_pocket_depth(mesh, center, normal)
-                if depth > depth_threshold:
-                    deep_faces.append(i)
-                    max_depth = max(max_depth, depth)
+            depths = np.zeros(len(face_centers))
+            depths[candidates] = estimate_pocket_depths(mesh, face_centers[candidates], face_normals[candidates])
+            depths = depths[cache.face_twins]
+            deep_faces = np.where(depths > depth_threshold)[0]
             
-            result['max_depth'] = max_depth
+            result['max_depth'] = float(depths[deep_faces].max()) if len(deep_faces) else 0
             
         elif method == 'normal':
-            mesh_center = np.mean(mesh.verticesh.vertices, axis=0)
+            mesh_center = mesh.centroid
             
             # Vectorized approach for better performance
             to_faces = face_centers - mesh_center
@@ -90,19 +109,19 @@ def find_deep_pockets(mesh, depth_threshold=30.0, method='ray'):
             
             # Calculate dot products for all faces at once
             alignments = np.sum(face_normals * (-to_faces_norm), axis=1)
-            deep_faces = np.where(alignments > 0.3)[0].tolist()
+            deep_faces = np.where(alignments > 0.3)[0]
             
         else:
             raise ValueError(f"Unknown method: {method}")
             
         result['deep_faces_count'] = len(deep_faces)
-        return np.array(deep_faces), result
+        return deep_faces, result
         
     except Exception as e:
         result['error'] = str(e)
         return np.array([]), result
 
-def analyze_deep_pockets(mesh, depth_threshold=30.0, method='ray'):
+def analyze_deep_pockets(mesh, depth_threshold=30.0, method='ray', cache=None):
     """
     Analyze deep pockets with metadata.
     
@@ -110,11 +129,12 @@ def analyze_deep_pockets(mesh, depth_threshold=30.0, method='ray'):
         mesh: trimesh object
         depth_threshold: minimum depth to consider problematic
         method: 'ray' for ray casting, 'normal' for normal analysis
+        cache: MeshCache for this mesh, built on demand if not given
         
     Returns:
         dict: analysis results with metadata
     """
-    deep_indices, data = find_deep_pockets(mesh, depth_threshold, method)
+    deep_indices, data = find_deep_pockets(mesh, depth_threshold, method, cache)
     
     return {
         'count': len(deep_indices),
@@ -1,62 +1,114 @@
 import numpy as np
 import trimesh
+from mesh_utils import MeshCache, first_ray_distances
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba is optional; the numpy implementations below are used instead
+    NUMBA_AVAILABLE = False
+
+# Approach directions a standard 3-axis tool is tested from
+TOOL_DIRECTIONS = np.array([
+    [0, 0, -1], [0, 0, 1],
+    [1, 0, 0], [-1, 0, 0],
+    [0, 1, 0], [0, -1, 0]
+], dtype=np.float64)
+
+# Rays start this far back from the face along each approach direction
+TOOL_RAY_DISTANCE = 50.0
+_TOOL_RAY_OFFSETS = TOOL_DIRECTIONS * TOOL_RAY_DISTANCE
 
 def is_surface_external(face_center, face_normal, mesh_bounds, tolerance=2.0):
     """Check if a face is on the external boundary (good for CNC)."""
-    for axis in range(3):
-        for bound_idx in [0, 1]:
-            distance_to_boundary = abs(face_center[axis] - mesh_bounds[bound_idx, axis])
-            if distance_to_boundary < tolerance:
-                return True
-    return False
+    # (2, 3) distances to the min and max bound on every axis, reduced in one pass
+    return bool(np.any(np.abs(face_center - mesh_bounds) < tolerance))
 ''' tool diameter ranging from 1mm to 25mm'''
 def has_clear_tool_access(face_center, face_normal, mesh, tool_diameter=3.0):
     """Check if a standard CNC tool can access this face."""
     try:
-        test_directions = [
-            np.array([0, 0, -1]), np.array([0, 0, 1]),
-            np.array([1, 0, 0]), np.array([-1, 0, 0]),
-            np.array([0, 1, 0]), np.array([0, -1, 0])
-        ]
-        
         accessible_directions = 0
         tool_radius = tool_diameter / 2.0
         
-        for direction in test_directions:
-            ray_start = face_center - direction * 50.0
+        for direction, offset in zip(TOOL_DIRECTIONS, _TOOL_RAY_OFFSETS):
+            ray_start = face_center - offset
             
-            locations, ray_indices, face_indices = mesh.ray.intersects_location(
-                ray_origins=ray_start.reshape(1, -1),
-                ray_directions=direction.reshape(1, -1)
-            )
+            first_hit_distance = first_ray_distances(
+                mesh, ray_start.reshape(1, -1), direction.reshape(1, -1)
+            )[0]
             
-            if len(locations) == 0:
+            if np.isnan(first_hit_distance):
                 accessible_directions += 1
                 continue
             
-            distances = np.linalg.norm(locations - ray_start, axis=1)
-            target_distance = np.linalg.norm(face_center - ray_start)
-            
-            if len(distances) > 0:
-                first_hit_distance = np.min(distances)
-                if abs(first_hit_distance - target_distance) < tool_radius:
-                    accessible_directions += 1
+            if abs(first_hit_distance - TOOL_RAY_DISTANCE) < tool_radius:
+                accessible_directions += 1
         
         return accessible_directions > 0
         
     except Exception:
         return True
 
+def has_clear_tool_access_batch(face_centers, mesh, tool_diameter=3.0):
+    """Check tool access for many faces, casting all 6 directions per face in one batch."""
+    face_centers = np.asarray(face_centers, dtype=np.float64).reshape(-1, 3)
+    n_faces = len(face_centers)
+    n_dirs = len(TOOL_DIRECTIONS)
+    
+    try:
+        # (N*6, 3) rays: every face paired with every direction, face-major
+        directions = np.tile(TOOL_DIRECTIONS, (n_faces, 1))
+        ray_starts = (face_centers[:, None, :] - _TOOL_RAY_OFFSETS[None, :, :]).reshape(-1, 3)
+        
+        first_hit_distances = first_ray_distances(mesh, ray_starts, directions)
+        
+        # A direction is clear if the ray escapes or its first hit is this face
+        tool_radius = tool_diameter / 2.0
+        clear = np.isnan(first_hit_distances) | (np.abs(first_hit_distances - TOOL_RAY_DISTANCE) < tool_radius)
+        
+        return clear.reshape(n_faces, n_dirs).any(axis=1)
+        
+    except Exception:
+        return np.ones(n_faces, dtype=bool)
+
 def is_face_in_deep_pocket(face_center, mesh_bounds, min_depth=10.0):
     """Check if face is deep inside the part."""
-    depths = []
-    for axis in range(3):
-        depth_from_min = face_center[axis] - mesh_bounds[0, axis]
-        depth_from_max = mesh_bounds[1, axis] - face_center[axis]
-        min_depth_this_axis = min(depth_from_min, depth_from_max)
-        depths.append(min_depth_this_axis)
+    face_center = np.asarray(face_center, dtype=np.float64).reshape(1, 3)
+    return bool(faces_in_deep_pocket(face_center, np.asarray(mesh_bounds, dtype=np.float64), min_depth)[0])
+
+def _faces_in_deep_pocket_numpy(face_centers, mesh_bounds, min_depth):
+    """Deep-pocket mask for (N, 3) face centers: smallest inset over all axes exceeds min_depth."""
+    depths = np.minimum(face_centers - mesh_bounds[0], mesh_bounds[1] - face_centers)
+    return depths.min(axis=1) > min_depth
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _faces_in_deep_pocket_jit(face_centers, mesh_bounds, min_depth):
+        """Compiled equivalent of _faces_in_deep_pocket_numpy, one pass over the centers."""
+        n = face_centers.shape[0]
+        deep = np.empty(n, dtype=np.bool_)
+        
+        for i in prange(n):
+            depth = np.inf
+            for axis in range(3):
+                depth = min(depth,
+                            face_centers[i, axis] - mesh_bounds[0, axis],
+                            mesh_bounds[1, axis] - face_centers[i, axis])
+            deep[i] = depth > min_depth
+        
+        return deep
+
+def faces_in_deep_pocket(face_centers, mesh_bounds, min_depth=10.0):
+    """Check which faces are deep inside the part, for (N, 3) face centers."""
+    # float32 centers stay float32 (half the memory traffic); anything else is float64
+    dtype = np.float32 if np.asarray(face_centers).dtype == np.float32 else np.float64
+    face_centers = np.ascontiguousarray(face_centers, dtype=dtype)
+    mesh_bounds = np.ascontiguousarray(mesh_bounds, dtype=dtype)
     
-    return min(depths) > min_depth
+    if NUMBA_AVAILABLE:
+        return _faces_in_deep_pocket_jit(face_centers, mesh_bounds, float(min_depth))
+    return _faces_in_deep_pocket_numpy(face_centers, mesh_bounds, min_depth)
 
 def analyze_face_context(face_idx, mesh):
     """Analyze the geometric context of a face."""
@@ -74,3 +126,50 @@ def analyze_face_context(face_idx, mesh):
     
     return context
 
+def _face_contexts(cache, face_indices, mesh, tolerance, min_depth):
+    """Struct-of-arrays context for the given faces, or every face if face_indices is None."""
+    if face_indices is None:
+        face_centers, face_centers32, face_areas = cache.centers, cache.centers32, cache.areas
+        
+        # Rays only from surface faces; duplicate faces take their twin's result
+        # and zero-area faces count as accessible
+        has_tool_access = np.ones(len(face_centers), dtype=bool)
+        has_tool_access[cache.surface_faces] = has_clear_tool_access_batch(
+            face_centers[cache.surface_faces], mesh)
+        has_tool_access = has_tool_access[cache.face_twins]
+    else:
+        face_indices = np.asarray(face_indices, dtype=np.int64)
+        face_centers = cache.centers[face_indices]
+        face_centers32 = cache.centers32[face_indices]
+        face_areas = cache.areas[face_indices]
+        has_tool_access = has_clear_tool_access_batch(face_centers, mesh)
+    
+    # Within tolerance of any of the 6 bounding planes
+    boundary_distances = np.abs(face_centers32[:, None, :] - cache.bounds32[None, :, :])
+    
+    return {
+        'is_external': np.any(boundary_distances < tolerance, axis=(1, 2)),
+        'has_tool_access': has_tool_access,
+        'is_deep': faces_in_deep_pocket(face_centers32, cache.bounds32, min_depth),
+        'face_area': face_areas,
+    }
+
+def analyze_faces_context_batch(face_indices, mesh, tolerance=2.0, min_depth=10.0, cache=None):
+    """Analyze the geometric context of many faces at once, as arrays per field."""
+    cache = cache or MeshCache(mesh)
+    
+    # Index into the all-face contexts if an earlier check already computed them
+    all_contexts = cache.face_contexts.get((tolerance, min_depth))
+    if all_contexts is not None:
+        face_indices = np.asarray(face_indices, dtype=np.int64)
+        return {field: values[face_indices] for field, values in all_contexts.items()}
+    
+    return _face_contexts(cache, face_indices, mesh, tolerance, min_depth)
+
+def analyze_all_face_contexts(mesh, tolerance=2.0, min_depth=10.0, cache=None):
+    """Analyze the geometric context of every face, computed once per MeshCache."""
+    cache = cache or MeshCache(mesh)
+    key = (tolerance, min_depth)
+    if key not in cache.face_contexts:
+        cache.face_contexts[key] = _face_contexts(cache, None, mesh, tolerance, min_depth)
+    return cache.face_contexts[key]
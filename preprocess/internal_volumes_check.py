@@ -1,145 +1,219 @@
 import numpy as np
 import trimesh
+from mesh_utils import MeshCache
 
-def check_external_openings(mesh):
+def _has_boundary_vertices(vertices, bounds, tolerance, min_count):
+    """Check if more than min_count vertices lie within tolerance of any of the 6 bounding planes."""
+    # (V, 2, 3) distances to the min and max bound on every axis, counted per plane
+    near_boundary = np.abs(vertices[:, None, :] - bounds[None, :, :]) < tolerance
+    return bool((np.count_nonzero(near_boundary, axis=0) > min_count).any())
+
+def _bounding_box_ratio(actual_volume, bounds):
+    """
+    Lower bound on actual_volume / convex hull volume.
+    
+    The convex hull lies inside the axis-aligned bounding box, so a part that
+    fills enough of its box is solid enough without building the hull.
+    """
+    bbox_volume = np.prod(bounds[1] - bounds[0])
+    return actual_volume / bbox_volume if bbox_volume > 0 else 0.0
+
+def _external_openings(mesh, cache, tolerance, min_count):
+    """_has_boundary_vertices for the mesh, computed once per MeshCache and threshold."""
+    key = (tolerance, min_count)
+    if key not in cache.external_openings:
+        cache.external_openings[key] = _has_boundary_vertices(mesh.vertices, cache.bounds, tolerance, min_count)
+    return cache.external_openings[key]
+
+def check_external_openings(mesh, cache=None):
     """Check if mesh has openings to external surfaces (normal for brackets)."""
     try:
-        bounds = mesh.bounds
-        vertices = mesh.vertices
-        tolerance = 0.1  # mm
-        
-        # Check each boundary plane
-        for axis in [0, 1, 2]:  # X, Y, Z
-            for bound in [bounds[0, axis], bounds[1, axis]]:
-                on_boundary = np.abs(vertices[:, axis] - bound) < tolerance
-                if np.sum(on_boundary) > 3:  # More than a few vertices on boundary
-                    return True
-        
-        return False
+        # More than a few vertices on any boundary plane
+        return _external_openings(mesh, cache or MeshCache(mesh), tolerance=0.1, min_count=3)
     except:
         return True  # Conservative: assume openings exist
 
-def realistic_internal_volumes(mesh):
+def find_enclosed_shells(mesh):
     """
-    Reality check: Only flag ACTUALLY problematic internal volumes.
-    A triangular bracket with open space is NOT an internal volume problem.
+    Find face shells sealed inside another shell of the mesh (enclosed voids).
+    
+    Shells are the connected components of the face adjacency graph. A point
+    just behind one face of each shell is tested for containment in every
+    other shell; one contained by an odd number of them lies in material. Such
+    a shell bounds a void no tool can reach only if it faces inward (negative
+    signed volume); an outward-facing one is a solid body nested inside
+    another that was never merged with it.
+    
+    Args:
+        mesh: trimesh object
+        
+    Returns:
+        list: face index arrays, one per enclosed shell
+    """
+    shells = trimesh.graph.connected_components(mesh.face_adjacency, nodes=np.arange(len(mesh.faces)))
+    if len(shells) < 2:
+        return []
+    
+    # One probe point per shell, moved off its first face against the face
+    # normal so it lies on no surface and cannot count its own shell
+    probes = np.array([shell[0] for shell in shells])
+    points = mesh.triangles_center[probes] - mesh.face_normals[probes] * (mesh.scale * 1e-6)
+    
+    containing = np.zeros(len(shells), dtype=np.int64)
+    for shell_idx, shell in enumerate(shells):
+        # Only probes inside this shell's bounding box can be inside the shell
+        shell_vertices = mesh.vertices[mesh.faces[shell].ravel()]
+        lower, upper = shell_vertices.min(axis=0), shell_vertices.max(axis=0)
+        candidates = np.flatnonzero(np.all((points >= lower) & (points <= upper), axis=1))
+        candidates = candidates[candidates != shell_idx]
+        if len(candidates) == 0:
+            continue
+        
+        # contains() re-casts rays that graze edges or vertices, unlike a raw
+        # crossing count, where such hits are reported once per triangle
+        shell_mesh = mesh.submesh([shell], append=True)
+        containing[candidates] += shell_mesh.contains(points[candidates])
+    
+    # Signed volume of every shell, summed from its faces' tetrahedra with the origin
+    face_shell = np.empty(len(mesh.faces), dtype=np.int64)
+    for shell_idx, shell in enumerate(shells):
+        face_shell[shell] = shell_idx
+    triangles = mesh.triangles
+    tetra_volumes = np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])) / 6.0
+    shell_volumes = np.bincount(face_shell, weights=tetra_volumes, minlength=len(shells))
+    
+    return [shells[i] for i in np.flatnonzero((containing % 2 == 1) & (shell_volumes < 0))]
+
+def _internal_volumes_core(mesh, cache, solid_ratio, boundary_tolerance, min_boundary_count,
+                           report_openings, watertight_error, error_format):
+    """
+    Shared internal volume check behind the realistic and context-aware variants.
+    
+    A watertight mesh with a shell sealed inside another (see
+    find_enclosed_shells) has severity 2. Otherwise, a mesh without external
+    openings is flagged when its volume is well below its convex hull volume:
+    severity 2 below a ratio of 0.3, 1 below solid_ratio, 0 otherwise.
+    
+    Args:
+        mesh: trimesh object
+        cache: MeshCache for this mesh, built on demand if not given
+        solid_ratio: volume ratio at or above which the part is solid enough
+        boundary_tolerance: distance from a bounding plane counted as on it
+        min_boundary_count: vertices on one bounding plane needed for an opening
+        report_openings: whether the result carries 'has_external_openings'
+        watertight_error: error message for meshes that are not watertight
+        error_format: error message for other failures, formatted with the exception
+        
+    Returns:
+        tuple: (severity, result dict)
     """
     result = {
         'is_watertight': mesh.is_watertight,
         'actual_volume': 0,
         'convex_volume': 0,
         'volume_ratio': 0,
+        'ratio_source': None,
+        'enclosed_shells': 0,
         'error': None
     }
+    if report_openings:
+        result['has_external_openings'] = False
     
     if not mesh.is_watertight:
-        result['error'] = "Mesh is not watertight - cannot detect internal volumes reliably"
+        result['error'] = watertight_error
         return 0, result
     
     try:
+        cache = cache or MeshCache(mesh)
         actual_volume = mesh.volume
-        convex_volume = mesh.convex_hull.volume
-        volume_ratio = actual_volume / convex_volume
+        result['actual_volume'] = actual_volume
         
-        result.update({
-            'actual_volume': actual_volume,
-            'convex_volume': convex_volume,
-            'volume_ratio': volume_ratio
-        })
-        
-        # REALITY CHECK: Only flag if volume ratio suggests ENCLOSED hollow spaces
-        # Not just external voids (which are normal for brackets)
+        # A sealed void is a problem whatever the volume ratio says, and is
+        # found from the face adjacency alone, without the convex hull
+        enclosed_shells = find_enclosed_shells(mesh)
+        result['enclosed_shells'] = len(enclosed_shells)
+        if enclosed_shells:
+            return 2, result
         
-        # Check if the mesh has obvious external openings
-        has_external_openings = check_external_openings(mesh)
+        # External voids (like bracket cutouts) are FINE for CNC, only truly
+        # enclosed internal spaces are flagged
+        has_openings = _external_openings(mesh, cache, boundary_tolerance, min_boundary_count)
+        if report_openings:
+            result['has_external_openings'] = has_openings
         
-        if has_external_openings:
-            # External voids (like bracket cutouts) are FINE for CNC
+        # Solid enough against the bounding box means solid enough against the hull
+        bbox_ratio = _bounding_box_ratio(actual_volume, cache.bounds)
+        if bbox_ratio >= solid_ratio:
+            result.update({
+                'volume_ratio': bbox_ratio,
+                'ratio_source': 'bounding_box'
+            })
             return 0, result
         
-        # Only flag truly enclosed internal spaces
-        if volume_ratio < 0.3:  # Very hollow = possible internal spaces
-            return 2, result
-        elif volume_ratio < 0.6:  # Somewhat hollow = minor concern
-            return 1, result
-        else:
-            return 0, result  # Solid enough
-            
-    except Exception as e:
-        result['error'] = f"Error calculating volumes: {e}"
-        return 0, result
-
-def context_aware_internal_volumes(mesh):
-    """Improved internal volume detection with context awareness."""
-    result = {
-        'is_watertight': mesh.is_watertight,
-        'actual_volume': 0,
-        'convex_volume': 0,
-        'volume_ratio': 0,
-        'has_external_openings': False,
-        'error': None
-    }
-    
-    if not mesh.is_watertight:
-        result['error'] = "Mesh is not watertight"
-        return 0, result
-    
-    try:
-        actual_volume = mesh.volume
-        convex_volume = mesh.convex_hull.volume
+        convex_volume = cache.convex_volume
         volume_ratio = actual_volume / convex_volume
         
         result.update({
-            'actual_volume': actual_volume,
             'convex_volume': convex_volume,
-            'volume_ratio': volume_ratio
+            'volume_ratio': volume_ratio,
+            'ratio_source': 'convex_hull'
         })
         
-        # Check for external openings
-        bounds = mesh.bounds
-        vertices = mesh.vertices
-        tolerance = 1.0
-        
-        has_openings = False
-        for axis in range(3):
-            for bound_value in [bounds[0, axis], bounds[1, axis]]:
-                near_boundary = np.abs(vertices[:, axis] - bound_value) < tolerance
-                if np.sum(near_boundary) > len(vertices) * 0.1:
-                    has_openings = True
-                    break
-        
-        result['has_external_openings'] = has_openings
-        
         if has_openings:
-            return 0, result  # External voids are fine
+            return 0, result
         
-        if volume_ratio < 0.3:
+        if volume_ratio < 0.3:  # Very hollow = possible internal spaces
             return 2, result
-        elif volume_ratio < 0.7:
+        elif volume_ratio < solid_ratio:  # Somewhat hollow = minor concern
             return 1, result
         else:
-            return 0, result
+            return 0, result  # Solid enough
             
     except Exception as e:
-        result['error'] = str(e)
+        result['error'] = error_format.format(e)
         return 0, result
 
-def analyze_internal_volumes(mesh, use_context=True):
+def realistic_internal_volumes(mesh, cache=None):
+    """
+    Reality check: Only flag ACTUALLY problematic internal volumes.
+    A triangular bracket with open space is NOT an internal volume problem.
+    """
+    # Openings: more than a few vertices on any boundary plane
+    return _internal_volumes_core(
+        mesh, cache, solid_ratio=0.6, boundary_tolerance=0.1, min_boundary_count=3,
+        report_openings=False,
+        watertight_error="Mesh is not watertight - cannot detect internal volumes reliably",
+        error_format="Error calculating volumes: {}"
+    )
+
+def context_aware_internal_volumes(mesh, cache=None):
+    """Improved internal volume detection with context awareness."""
+    # Openings: over 10% of vertices on a boundary plane
+    return _internal_volumes_core(
+        mesh, cache, solid_ratio=0.7, boundary_tolerance=1.0,
+        min_boundary_count=len(mesh.vertices) * 0.1,
+        report_openings=True,
+        watertight_error="Mesh is not watertight",
+        error_format="{}"
+    )
+
+def analyze_internal_volumes(mesh, use_context=True, cache=None):
     """
     Analyze internal volumes with metadata.
     
     Args:
         mesh: trimesh object
         use_context: whether to use context-aware analysis
+        cache: MeshCache for this mesh, built on demand if not given
         
     Returns:
         dict: analysis results with metadata
     """
     if use_context:
-        severity, data = context_aware_internal_volumes(mesh)
+        severity, data = context_aware_internal_volumes(mesh, cache)
         analysis_type = "context-aware"
     else:
-        severity, data = realistic_internal_volumes(mesh)
+        severity, data = realistic_internal_volumes(mesh, cache)
         analysis_type = "realistic"
     
     return {
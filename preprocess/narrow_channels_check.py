@@ -1,29 +1,29 @@
 import numpy as np
 import trimesh
+from mesh_utils import MeshCache
 
-def find_narrow_channels(mesh, min_channel_width=2.0):
+def find_narrow_channels(mesh, min_channel_width=2.0, cache=None):
     """
     Find narrow channels based on face area.
     
     Args:
         mesh: trimesh object
         min_channel_width: minimum channel width in mm
+        cache: MeshCache for this mesh, built on demand if not given
         
     Returns:
         array: indices of faces in narrow channels
     """
-    face_areas = mesh.area_faces
+    face_areas = (cache or MeshCache(mesh)).areas
     
-    # Estimate channel width from face area (assuming roughly square faces)
-    estimated_widths = np.sqrt(face_areas)
-    
-    # Find faces that are too narrow
-    narrow_mask = estimated_widths < min_channel_width
+    # Find faces that are too narrow, estimating channel width as sqrt(area)
+    # (assuming roughly square faces) and comparing squared to skip the sqrt
+    narrow_mask = face_areas < min_channel_width ** 2
     narrow_indices = np.where(narrow_mask)[0]
     
     return narrow_indices
 
-def realistic_narrow_channels(mesh, min_channel_width=2.0):
+def realistic_narrow_channels(mesh, min_channel_width=2.0, cache=None):
     """
     Reality check: Only flag ACTUAL narrow channels, not small mesh faces.
     """
@@ -35,17 +35,17 @@ def realistic_narrow_channels(mesh, min_channel_width=2.0):
     }
     
     try:
-        face_areas = mesh.area_faces
+        face_areas = (cache or MeshCache(mesh)).areas
         
         # Ignore tiny faces (mesh artifacts)
-        significant_faces = face_areas[face_areas > 1.0]  # > 1 sq mm
+        significant_indices = np.where(face_areas > 1.0)[0]  # > 1 sq mm
+        significant_faces = face_areas[significant_indices]
         
         if len(significant_faces) == 0:
             return np.array([]), result
         
-        # Estimate channel width only for significant faces
-        estimated_widths = np.sqrt(significant_faces)
-        narrow_significant = estimated_widths < min_channel_width
+        # Estimate channel width only for significant faces, compared squared
+        narrow_significant = significant_faces < min_channel_width ** 2
         
         # Only flag if there are CLUSTERS of narrow faces (actual channels)
         narrow_count = np.sum(narrow_significant)
@@ -59,8 +59,7 @@ def realistic_narrow_channels(mesh, min_channel_width=2.0):
         
         # Only flag if there are many clustered narrow faces
         if narrow_pct > 15:  # 15% of significant faces are narrow
-            narrow_indices = np.where(face_areas > 1.0)[0]  # Return actual indices
-            narrow_indices = narrow_indices[narrow_significant]
+            narrow_indices = significant_indices[narrow_significant]  # Return actual indices
             result['actual_narrow_channels'] = len(narrow_indices)
             return narrow_indices, result
         else:
@@ -71,25 +70,20 @@ def realistic_narrow_channels(mesh, min_channel_width=2.0):
         result['error'] = str(e)
         return np.array([]), result
 
-def context_aware_narrow_channels(mesh, min_channel_width=2.0):
+def context_aware_narrow_channels(mesh, min_channel_width=2.0, cache=None):
     """Find ACTUAL narrow channels, not just small external faces."""
-    from geometric_context import analyze_face_context
-    
-    face_areas = mesh.area_faces
-    estimated_widths = np.sqrt(face_areas)
-    potentially_narrow = np.where(estimated_widths < min_channel_width)[0]
+    from geometric_context import analyze_faces_context_batch
     
-    actual_narrow_channels = []
+    cache = cache or MeshCache(mesh)
+    # sqrt(area) < width, compared squared
+    potentially_narrow = np.where(cache.areas < min_channel_width ** 2)[0]
     
-    for face_idx in potentially_narrow:
-        context = analyze_face_context(face_idx, mesh)
-        
-        if context['is_deep'] and not context['has_tool_access'] and not context['is_external']:
-            actual_narrow_channels.append(face_idx)
+    context = analyze_faces_context_batch(potentially_narrow, mesh, cache=cache)
+    is_channel = context['is_deep'] & ~context['has_tool_access'] & ~context['is_external']
     
-    return np.array(actual_narrow_channels)
+    return potentially_narrow[is_channel]
 
-def analyze_narrow_channels(mesh, min_channel_width=2.0, use_context=True):
+def analyze_narrow_channels(mesh, min_channel_width=2.0, use_context=True, cache=None):
     """
     Analyze narrow channels with metadata.
     
@@ -97,21 +91,22 @@ def analyze_narrow_channels(mesh, min_channel_width=2.0, use_context=True):
         mesh: trimesh object
         min_channel_width: minimum channel width in mm
         use_context: whether to use context-aware analysis
+        cache: MeshCache for this mesh, built on demand if not given
         
     Returns:
         dict: analysis results with metadata
     """
     if use_context:
         try:
-            narrow_indices = context_aware_narrow_channels(mesh, min_channel_width)
+            narrow_indices = context_aware_narrow_channels(mesh, min_channel_width, cache)
             analysis_type = "context-aware"
             data = {'actual_narrow_channels': len(narrow_indices)}
         except ImportError:
             # Fallback to realistic if context module not available
-            narrow_indices, data = realistic_narrow_channels(mesh, min_channel_width)
+            narrow_indices, data = realistic_narrow_channels(mesh, min_channel_width, cache)
             analysis_type = "realistic"
     else:
-        narrow_indices = find_narrow_channels(mesh, min_channel_width)
+        narrow_indices = find_narrow_channels(mesh, min_channel_width, cache)
         analysis_type = "basic"
         data = {'total_narrow': len(narrow_indices)}
     
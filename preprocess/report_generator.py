@@ -1,94 +1,146 @@
 import datetime
 import json
-from visualization import interpret_score
+from bisect import bisect_right
+import numpy as np
 
-class ReportGenerator:
-    """Generate analysis reports in various formats."""
-    
-    def __init__(self, analyzer, mesh_info=None):
-        self.analyzer = analyzer
-        self.mesh_info = mesh_info
-        
-    def generate_html_report(self, visualization_fig=None, summary_chart_base64=None):
-        """Generate comprehensive HTML report."""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        score = self.analyzer.calculate_score()
-        interpretation = interpret_score(score)
-        
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>CNC Manufacturability Report</title>
-    <style>
-        body {{
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    # orjson is optional; the standard json module is used instead
+    ORJSON_AVAILABLE = False
+
+# Stylesheet of the HTML report, kept out of the report f-string so its braces
+# need no escaping
+_CSS = """    <style>
+        body {
             font-family: Arial, sans-serif;
             margin: 20px;
             background-color: #f5f5f5;
-        }}
-        .header {{
+        }
+        .header {
             background-color: #2c3e50;
             color: white;
             padding: 20px;
             border-radius: 10px;
             margin-bottom: 20px;
-        }}
-        .section {{
+        }
+        .section {
             background-color: white;
             padding: 20px;
             margin-bottom: 20px;
             border-radius: 10px;
             box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }}
-        .score-box {{
+        }
+        .score-box {
             font-size: 48px;
             font-weight: bold;
             text-align: center;
             padding: 20px;
             border-radius: 10px;
             margin: 20px 0;
-        }}
-        .excellent {{ background-color: #2ecc71; color: white; }}
-        .good {{ background-color: #3498db; color: white; }}
-        .fair {{ background-color: #f39c12; color: white; }}
-        .difficult {{ background-color: #e74c3c; color: white; }}
-        .problem-item {{
+        }
+        .excellent { background-color: #2ecc71; color: white; }
+        .good { background-color: #3498db; color: white; }
+        .fair { background-color: #f39c12; color: white; }
+        .difficult { background-color: #e74c3c; color: white; }
+        .problem-item {
             background-color: #f8f9fa;
             padding: 15px;
             margin: 10px 0;
             border-left: 5px solid #e74c3c;
             border-radius: 5px;
-        }}
-        .no-problem {{
+        }
+        .no-problem {
             border-left-color: #2ecc71;
-        }}
-        .recommendation {{
+        }
+        .recommendation {
             background-color: #e8f4f8;
             padding: 15px;
             border-left: 5px solid #3498db;
             margin: 10px 0;
             border-radius: 5px;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 12px;
             text-align: left;
             border-bottom: 1px solid #ddd;
-        }}
-        th {{
+        }
+        th {
             background-color: #34495e;
             color: white;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             text-align: center;
             margin: 20px 0;
-        }}
+        }
     </style>
-</head>
+"""
+
+# Score box CSS classes: below 70, 70-80, 80-90 and 90 or above
+_SCORE_BOUNDS = (70, 80, 90)
+_SCORE_CLASSES = ('difficult', 'fair', 'good', 'excellent')
+
+# Report labels for the numeric severity levels 0-2
+_SEVERITY_LABELS = ('None', 'Minor', 'Major')
+
+def _severity_label(severity):
+    """Report label of a severity; face-count analyses already use labels like 'high'."""
+    if isinstance(severity, (int, float)) and severity in (0, 1, 2):
+        return _SEVERITY_LABELS[int(severity)]
+    return str(severity)
+
+def _json_default(value):
+    """JSON form of values json cannot encode: numpy arrays and scalars as their Python equivalents, anything else as str."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def _summarize(results):
+    """
+    Fields of one analysis result used by the reports, read in one place.
+    
+    Returns:
+        tuple: (has_problem, count, severity, recommendation, data), None for absent fields
+    """
+    count = results.get('count')
+    severity = results.get('severity')
+    has_problem = results.get('has_problem')
+    if has_problem is None:
+        # Only numeric severities rank problems
+        numeric_severity = severity if isinstance(severity, (int, float)) else 0
+        has_problem = (count or 0) > 0 or numeric_severity > 0
+    return has_problem, count, severity, results.get('recommendation'), results.get('data')
+
+class ReportGenerator:
+    """Generate analysis reports in various formats."""
+    
+    def __init__(self, analyzer, mesh_info=None):
+        self.analyzer = analyzer
+        self.mesh_info = mesh_info
+        
+        # Generation time, taken on the first report so every format of this
+        # report shows the same one
+        self._generated_at = None
+        
+    def generate_html_report(self, visualization_fig=None, summary_chart_base64=None):
+        """Generate comprehensive HTML report."""
+        timestamp = self._timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        score, interpretation = self._score()
+        
+        parts = [f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>CNC Manufacturability Report</title>
+{_CSS}</head>
 <body>
     <div class="header">
         <h1>CNC Manufacturability Analysis Report</h1>
@@ -102,22 +154,22 @@ class ReportGenerator:
         </div>
         <p style="text-align: center; font-size: 20px;">{interpretation}</p>
     </div>
-"""
+"""]
         
         # Add summary chart if available
         if summary_chart_base64:
-            html += f"""
+            parts.append(f"""
     <div class="section">
         <h2>Analysis Summary</h2>
         <div class="chart-container">
             <img src="data:image/png;base64,{summary_chart_base64}" alt="Summary Chart" style="max-width: 100%;">
         </div>
     </div>
-"""
+""")
         
         # Mesh information
         if self.mesh_info:
-            html += f"""
+            parts.append(f"""
     <div class="section">
         <h2>Mesh Information</h2>
         <table>
@@ -128,72 +180,72 @@ class ReportGenerator:
             <tr><td>Watertight</td><td>{'Yes' if self.mesh_info.get('is_watertight', False) else 'No'}</td></tr>
         </table>
     </div>
-"""
+""")
         
         # Detailed analysis results
-        html += """
+        parts.append("""
     <div class="section">
         <h2>Detailed Analysis Results</h2>
-"""
+""")
         
         for function_name, results in self.analyzer.results.items():
             problem_name = function_name.replace('_', ' ').title()
-            has_problem = results.get('has_problem', results.get('count', 0) > 0 or results.get('severity', 0) > 0)
+            has_problem, count, severity, recommendation, data = _summarize(results)
             
-            html += f"""
+            item = [f"""
         <div class="problem-item {'no-problem' if not has_problem else ''}">
             <h3>{problem_name}</h3>
-"""
+"""]
             
             if 'error' in results:
-                html += f"<p style='color: red;'>Error: {results['error']}</p>"
+                item.append(f"<p style='color: red;'>Error: {results['error']}</p>")
             else:
                 if has_problem:
-                    if 'count' in results:
-                        html += f"<p><strong>Found:</strong> {results['count']} problematic faces</p>"
-                    if 'severity' in results:
-                        html += f"<p><strong>Severity:</strong> {['None', 'Minor', 'Major'][results['severity']]}</p>"
-                    if 'recommendation' in results:
-                        html += f"<div class='recommendation'><strong>Recommendation:</strong> {results['recommendation']}</div>"
+                    if count is not None:
+                        item.append(f"<p><strong>Found:</strong> {count} problematic faces</p>")
+                    if severity is not None:
+                        item.append(f"<p><strong>Severity:</strong> {_severity_label(severity)}</p>")
+                    if recommendation is not None:
+                        item.append(f"<div class='recommendation'><strong>Recommendation:</strong> {recommendation}</div>")
                 else:
-                    html += "<p style='color: green;'><strong>✓ No issues detected</strong></p>"
+                    item.append("<p style='color: green;'><strong>✓ No issues detected</strong></p>")
                 
                 # Add specific details
-                if 'data' in results and isinstance(results['data'], dict):
-                    html += "<p><strong>Details:</strong></p><ul>"
-                    for key, value in results['data'].items():
+                if isinstance(data, dict):
+                    item.append("<p><strong>Details:</strong></p><ul>")
+                    for key, value in data.items():
                         if key != 'error' and not key.startswith('_'):
-                            html += f"<li>{key.replace('_', ' ').title()}: {value}</li>"
-                    html += "</ul>"
+                            item.append(f"<li>{key.replace('_', ' ').title()}: {value}</li>")
+                    item.append("</ul>")
             
-            html += "</div>"
+            item.append("</div>")
+            parts.append(''.join(item))
         
-        html += """
+        parts.append("""
     </div>
     
     <div class="section">
         <h2>Recommendations</h2>
-"""
+""")
         
         recommendations = self._generate_recommendations()
-        for rec in recommendations:
-            html += f"<div class='recommendation'>{rec}</div>"
+        parts.extend(f"<div class='recommendation'>{rec}</div>" for rec in recommendations)
         
-        html += """
+        parts.append("""
     </div>
 </body>
 </html>
-"""
-        return html
+""")
+        return ''.join(parts)
     
     def generate_json_report(self):
         """Generate JSON report for programmatic use."""
-        score = self.analyzer.calculate_score()
+        score, interpretation = self._score()
         
         report = {
-            'timestamp': datetime.datetime.now().isoformat(),
+            'timestamp': self._timestamp.isoformat(),
             'score': score,
-            'interpretation': interpret_score(score),
+            'interpretation': interpretation,
             'mesh_info': self.mesh_info,
             'analysis_results': self.analyzer.results,
             'problem_regions': [
@@ -203,15 +255,22 @@ class ReportGenerator:
             'recommendations': self._generate_recommendations()
         }
         
-        return json.dumps(report, indent=2)
+        # Analysis results carry numpy scalars and index arrays, which orjson
+        # serializes natively; both backends write them as JSON numbers and lists
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(
+                report,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ).decode('utf-8')
+        return json.dumps(report, indent=2, default=_json_default)
     
     def generate_markdown_report(self):
         """Generate Markdown report."""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        score = self.analyzer.calculate_score()
-        interpretation = interpret_score(score)
+        timestamp = self._timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        score, interpretation = self._score()
         
-        md = f"""# CNC Manufacturability Analysis Report
+        parts = [f"""# CNC Manufacturability Analysis Report
 
 Generated: {timestamp}
 
@@ -221,69 +280,77 @@ Generated: {timestamp}
 
 ## Mesh Information
 
-"""
+"""]
         if self.mesh_info:
-            md += f"""- **Vertices:** {self.mesh_info.get('vertices', 'N/A')}
+            parts.append(f"""- **Vertices:** {self.mesh_info.get('vertices', 'N/A')}
 - **Faces:** {self.mesh_info.get('faces', 'N/A')}
 - **Volume:** {self.mesh_info.get('volume', 0):.2f} mm³
 - **Watertight:** {'Yes' if self.mesh_info.get('is_watertight', False) else 'No'}
 
-"""
+""")
         
-        md += "## Analysis Results\n\n"
+        parts.append("## Analysis Results\n\n")
         
         for function_name, results in self.analyzer.results.items():
             problem_name = function_name.replace('_', ' ').title()
-            md += f"### {problem_name}\n\n"
+            item = [f"### {problem_name}\n\n"]
             
             if 'error' in results:
-                md += f"❌ **Error:** {results['error']}\n\n"
+                item.append(f"❌ **Error:** {results['error']}\n\n")
             else:
-                has_problem = results.get('has_problem', results.get('count', 0) > 0 or results.get('severity', 0) > 0)
+                has_problem, count, severity, recommendation, data = _summarize(results)
                 
                 if has_problem:
-                    md += "⚠️ **Issues Detected**\n\n"
-                    if 'count' in results:
-                        md += f"- **Count:** {results['count']} problematic faces\n"
-                    if 'severity' in results:
-                        md += f"- **Severity:** {['None', 'Minor', 'Major'][results['severity']]}\n"
-                    if 'recommendation' in results:
-                        md += f"- **Recommendation:** {results['recommendation']}\n"
+                    item.append("⚠️ **Issues Detected**\n\n")
+                    if count is not None:
+                        item.append(f"- **Count:** {count} problematic faces\n")
+                    if severity is not None:
+                        item.append(f"- **Severity:** {_severity_label(severity)}\n")
+                    if recommendation is not None:
+                        item.append(f"- **Recommendation:** {recommendation}\n")
                 else:
-                    md += "✅ **No issues detected**\n"
+                    item.append("✅ **No issues detected**\n")
                 # Add specific details if present
-                if 'data' in results and isinstance(results['data'], dict):
-                    md += "\n**Details:**\n"
-                    for key, value in results['data'].items():
+                if isinstance(data, dict):
+                    item.append("\n**Details:**\n")
+                    for key, value in data.items():
                         if key != 'error' and not key.startswith('_'):
-                            md += f"- {key.replace('_', ' ').title()}: {value}\n"
-            md += "\n"
+                            item.append(f"- {key.replace('_', ' ').title()}: {value}\n")
+            item.append("\n")
+            parts.append(''.join(item))
 
         # Recommendations section
-        md += "## Recommendations\n\n"
+        parts.append("## Recommendations\n\n")
         recommendations = self._generate_recommendations()
-        for rec in recommendations:
-            md += f"- {rec}\n"
+        parts.extend(f"- {rec}\n" for rec in recommendations)
 
-        return md
+        return ''.join(parts)
         
+    @property
+    def _timestamp(self):
+        """Time of the first report generated from this object."""
+        if self._generated_at is None:
+            self._generated_at = datetime.datetime.now()
+        return self._generated_at
+    
+    def _score(self):
+        """Analyzer score and its interpretation, computed once per report."""
+        score = self.analyzer.calculate_score()
+        return score, self._interpret_score(score)
+    
+    def _interpret_score(self, score):
+        """Text assessment of the score, see visualization.interpret_score."""
+        # Imported here: visualization pulls in plotly and matplotlib, which the
+        # text reports do not otherwise need
+        from visualization import interpret_score
+        return interpret_score(score)
+    
     def _get_score_class(self, score):
         """Return CSS class for score box based on score."""
-        if score >= 90:
-            return "excellent"
-        elif score >= 80:
-            return "good"
-        elif score >= 70:
-            return "fair"
-        else:
-            return "difficult"
+        return _SCORE_CLASSES[bisect_right(_SCORE_BOUNDS, score)]
 
     def _generate_recommendations(self):
         """Generate recommendations based on analysis results."""
-        recs = []
-        for function_name, results in self.analyzer.results.items():
-            if 'recommendation' in results and results['recommendation']:
-                recs.append(results['recommendation'])
-        if not recs:
-            recs.append("No major manufacturability issues detected. Design is CNC-friendly.")
-        return recs
\ No newline at end of file
+        recs = [results['recommendation'] for results in self.analyzer.results.values()
+                if results.get('recommendation')]
+        return recs or ["No major manufacturability issues detected. Design is CNC-friendly."]
\ No newline at end of file
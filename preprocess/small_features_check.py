@@ -1,7 +1,20 @@
 import numpy as np
 import trimesh
+from mesh_utils import MeshCache
 
-def find_small_features(mesh, min_tool_diameter=3.0, min_feature_size=1.0):
+def edge_length_stats(edge_lengths, very_small_length, small_length):
+    """
+    Summary statistics of a non-empty edge length array.
+    
+    Returns:
+        tuple: (min, max, mean, very_small_count, small_count), the counts being
+            edges shorter than very_small_length and small_length
+    """
+    return (edge_lengths.min(), edge_lengths.max(), edge_lengths.mean(),
+            np.count_nonzero(edge_lengths < very_small_length),
+            np.count_nonzero(edge_lengths < small_length))
+
+def find_small_features(mesh, min_tool_diameter=3.0, min_feature_size=1.0, cache=None):
     """
     Find features too small for standard CNC tools.
     
@@ -9,6 +22,7 @@ def find_small_features(mesh, min_tool_diameter=3.0, min_feature_size=1.0):
         mesh: trimesh object
         min_tool_diameter: minimum tool diameter in mm
         min_feature_size: minimum feature size threshold in mm
+        cache: MeshCache for this mesh, built on demand if not given
     
     Returns:
         tuple: (severity_level, metadata)
@@ -29,27 +43,25 @@ def find_small_features(mesh, min_tool_diameter=3.0, min_feature_size=1.0):
     
     try:
         # Get edge lengths in actual units (mm)
-        edge_lengths = mesh.edges_unique_length
+        edge_lengths = (cache or MeshCache(mesh)).edge_lengths
         
         if len(edge_lengths) == 0:
             result['error'] = "No edges found in mesh"
             return 0, result
         
-        # Calculate basic statistics
+        # Basic statistics and small feature counts in one pass; very small
+        # features are edges smaller than the minimum tool radius
+        min_length, max_length, mean_length, very_small_count, small_count = edge_length_stats(
+            edge_lengths, min_tool_diameter / 2, min_feature_size
+        )
+        
         result.update({
             'total_edges': len(edge_lengths),
-            'min_edge_length': np.min(edge_lengths),
-            'max_edge_length': np.max(edge_lengths),
-            'mean_edge_length': np.mean(edge_lengths)
+            'min_edge_length': min_length,
+            'max_edge_length': max_length,
+            'mean_edge_length': mean_length
         })
         
-        # Small features: edges smaller than minimum tool radius
-        very_small_mask = edge_lengths < (min_tool_diameter / 2)
-        small_mask = edge_lengths < min_feature_size
-        
-        very_small_count = np.sum(very_small_mask)
-        small_count = np.sum(small_mask)
-        
         # Calculate percentages
         very_small_pct = (very_small_count / len(edge_lengths)) * 100
         small_pct = (small_count / len(edge_lengths)) * 100
@@ -73,7 +85,7 @@ def find_small_features(mesh, min_tool_diameter=3.0, min_feature_size=1.0):
         result['error'] = str(e)
         return 0, result
 
-def realistic_small_features(mesh, min_tool_diameter=3.0):
+def realistic_small_features(mesh, min_tool_diameter=3.0, cache=None):
     """
     Reality check: Only flag ACTUAL small features, not mesh tessellation.
     """
@@ -85,24 +97,28 @@ def realistic_small_features(mesh, min_tool_diameter=3.0):
     }
     
     try:
-        edge_lengths = mesh.edges_unique_length
+        # Sorted once per MeshCache, so each threshold below is a binary search
+        # and repeated runs with other tool diameters skip the full scan
+        edge_lengths = (cache or MeshCache(mesh)).sorted_edge_lengths
         
         # Ignore very small edges (mesh tessellation)
         # Focus on edges that represent actual geometry
-        significant_edges = edge_lengths[edge_lengths > 0.5]  # Ignore sub-mm mesh edges
+        significant_start = int(np.searchsorted(edge_lengths, 0.5, side='right'))  # Ignore sub-mm mesh edges
+        significant_count = len(edge_lengths) - significant_start
         
-        if len(significant_edges) == 0:
+        if significant_count == 0:
             return 0, result
         
         # Only count edges that are consistently small across a region
         # (not just single mesh triangles)
-        small_significant = significant_edges[significant_edges < min_tool_diameter/2]
+        small_end = int(np.searchsorted(edge_lengths, min_tool_diameter/2, side='left'))
+        small_significant_count = max(0, small_end - significant_start)
         
-        small_pct = (len(small_significant) / len(significant_edges)) * 100
+        small_pct = (small_significant_count / significant_count) * 100
         
         result.update({
-            'actual_small_features': len(small_significant),
-            'mesh_tessellation_edges': len(edge_lengths) - len(significant_edges),
+            'actual_small_features': small_significant_count,
+            'mesh_tessellation_edges': len(edge_lengths) - significant_count,
             'small_significant_pct': small_pct
         })
         
@@ -118,7 +134,7 @@ def realistic_small_features(mesh, min_tool_diameter=3.0):
         result['error'] = str(e)
         return 0, result
 
-def analyze_small_features(mesh, min_tool_diameter=3.0, use_realistic=True):
+def analyze_small_features(mesh, min_tool_diameter=3.0, use_realistic=True, cache=None):
     """
     Analyze small features with metadata.
     
@@ -126,15 +142,16 @@ def analyze_small_features(mesh, min_tool_diameter=3.0, use_realistic=True):
         mesh: trimesh object
         min_tool_diameter: minimum tool diameter in mm
         use_realistic: whether to use realistic analysis (ignore mesh tessellation)
+        cache: MeshCache for this mesh, built on demand if not given
         
     Returns:
         dict: analysis results with metadata
     """
     if use_realistic:
-        severity, data = realistic_small_features(mesh, min_tool_diameter)
+        severity, data = realistic_small_features(mesh, min_tool_diameter, cache)
         analysis_type = "realistic"
     else:
-        severity, data = find_small_features(mesh, min_tool_diameter)
+        severity, data = find_small_features(mesh, min_tool_diameter, cache=cache)
         analysis_type = "basic"
     
     return {
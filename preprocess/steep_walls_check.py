@@ -1,55 +1,60 @@
 import numpy as np
 import trimesh
+from mesh_utils import MeshCache
 
-def find_steep_walls(mesh, angle_threshold=80.0):
+def steep_wall_mask(face_normals, angle_threshold=80.0):
     """
-    Find steep walls (near-vertical surfaces).
+    Mask of steep (near-vertical) faces, shared by the steep wall checks.
     
     Args:
-        mesh: trimesh object
+        face_normals: (N, 3) face normals
         angle_threshold: angle from horizontal in degrees
         
     Returns:
-        array: indices of steep faces
+        np.ndarray: (N,) bool, True where the face is steep
     """
-    face_normals = mesh.face_normals
-    
     # Convert angle threshold to radians and calculate z-component threshold
     angle_rad = np.radians(angle_threshold)
     z_threshold = np.sin(np.pi/2 - angle_rad)
     
-    # Find faces where the normal's z-component is small (near-vertical)
-    steep_mask = np.abs(face_normals[:, 2]) < z_threshold
-    steep_indices = np.where(steep_mask)[0]
+    # Faces where the normal's z-component is small (near-vertical)
+    return np.abs(face_normals[:, 2]) < z_threshold
+
+def find_steep_walls(mesh, angle_threshold=80.0):
+    """
+    Find steep walls (near-vertical surfaces).
     
-    return steep_indices
+    Args:
+        mesh: trimesh object
+        angle_threshold: angle from horizontal in degrees
+        
+    Returns:
+        array: indices of steep faces
+    """
+    return np.flatnonzero(steep_wall_mask(mesh.face_normals, angle_threshold))
 
-def realistic_steep_walls(mesh, angle_threshold=80.0, min_depth=5.0):
+def realistic_steep_walls(mesh, angle_threshold=80.0, min_depth=5.0, cache=None):
     """
     Reality check: Only flag steep walls that are ACTUALLY problematic.
     External walls are GOOD for CNC.
     """
-    face_normals = mesh.face_normals
-    face_centers = mesh.triangles_center
+    cache = cache or MeshCache(mesh)
+    face_normals = cache.normals
+    face_centers = cache.centers
     
     # Find steep faces
-    angle_rad = np.radians(angle_threshold)
-    z_threshold = np.sin(np.pi/2 - angle_rad)
-    steep_mask = np.abs(face_normals[:, 2]) < z_threshold
+    steep_mask = steep_wall_mask(face_normals, angle_threshold)
     
     # Only flag if they're deep inside the part
-    bounds = mesh.bounds
+    bounds = cache.bounds
     depth_from_top = bounds[1, 2] - face_centers[:, 2]
     deep_mask = depth_from_top > min_depth
     
-    # AND not near external boundaries
+    # AND not near external boundaries: (N, 2, 2) distances to the min and max
+    # X and Y bounds, reduced in one pass
     tolerance = 2.0  # mm from boundary
-    near_boundary = (
-        (np.abs(face_centers[:, 0] - bounds[0, 0]) < tolerance) |
-        (np.abs(face_centers[:, 0] - bounds[1, 0]) < tolerance) |
-        (np.abs(face_centers[:, 1] - bounds[0, 1]) < tolerance) |
-        (np.abs(face_centers[:, 1] - bounds[1, 1]) < tolerance)
-    )
+    xy_distances = np.abs(face_centers[:, None, :2] - bounds[None, :, :2])
+    near_boundary = (xy_distances < tolerance).any(axis=(1, 2))
     
     # Only problematic if steep AND deep AND not external
     problematic_mask = steep_mask & deep_mask & (~near_boundary)
@@ -65,27 +70,20 @@ def realistic_steep_walls(mesh, angle_threshold=80.0, min_depth=5.0):
     
     return problematic_indices, result
 
-def context_aware_steep_walls(mesh, angle_threshold=80.0):
+def context_aware_steep_walls(mesh, angle_threshold=80.0, cache=None):
     """Find steep walls that are ACTUALLY problematic with context."""
-    from geometric_context import analyze_face_context
+    from geometric_context import analyze_faces_context_batch
     
-    face_normals = mesh.face_normals
+    cache = cache or MeshCache(mesh)
     
-    angle_rad = np.radians(angle_threshold)
-    z_threshold = np.sin(np.pi/2 - angle_rad)
-    steep_faces = np.where(np.abs(face_normals[:, 2]) < z_threshold)[0]
+    steep_faces = np.flatnonzero(steep_wall_mask(cache.normals, angle_threshold))
     
-    problematic_steep = []
+    context = analyze_faces_context_batch(steep_faces, mesh, cache=cache)
     
-    for face_idx in steep_faces:
-        context = analyze_face_context(face_idx, mesh)
-        
-        if context['is_deep'] and not context['has_tool_access']:
-            problematic_steep.append(face_idx)
-    
-    return np.array(problematic_steep)
+    return steep_faces[context['is_deep'] & ~context['has_tool_access']]
 
-def analyze_steep_walls(mesh, angle_threshold=80.0, min_depth=5.0, use_context=True):
+def analyze_steep_walls(mesh, angle_threshold=80.0, min_depth=5.0, use_context=True, cache=None,
+                        return_indices=True):
     """
     Analyze steep walls with metadata.
     
@@ -94,30 +92,40 @@ def analyze_steep_walls(mesh, angle_threshold=80.0, min_depth=5.0, use_context=T
         angle_threshold: angle from horizontal in degrees
         min_depth: minimum depth to consider problematic
         use_context: whether to use context-aware analysis
+        cache: MeshCache for this mesh, built on demand if not given
+        return_indices: if False, 'indices' is None and basic analysis only
+            counts the steep faces
         
     Returns:
         dict: analysis results with metadata
     """
     if use_context:
         try:
-            steep_indices = context_aware_steep_walls(mesh, angle_threshold)
+            steep_indices = context_aware_steep_walls(mesh, angle_threshold, cache)
             analysis_type = "context-aware"
             data = {'problematic_steep': len(steep_indices)}
         except ImportError:
             # Fallback to realistic if context module not available
-            steep_indices, data = realistic_steep_walls(mesh, angle_threshold, min_depth)
+            steep_indices, data = realistic_steep_walls(mesh, angle_threshold, min_depth, cache)
             analysis_type = "realistic"
-    else:
+    elif return_indices:
         steep_indices = find_steep_walls(mesh, angle_threshold)
         analysis_type = "basic"
         data = {'total_steep': len(steep_indices)}
+    else:
+        # Summary only: count the mask without extracting indices
+        steep_indices = None
+        analysis_type = "basic"
+        data = {'total_steep': int(np.count_nonzero(steep_wall_mask(mesh.face_normals, angle_threshold)))}
+    
+    count = data['total_steep'] if steep_indices is None else len(steep_indices)
     
     return {
-        'count': len(steep_indices),
-        'indices': steep_indices,
+        'count': count,
+        'indices': steep_indices if return_indices else None,
         'data': data,
         'analysis_type': analysis_type,
         'angle_threshold': angle_threshold,
-        'has_problem': len(steep_indices) > 0,
-        'severity': 'high' if len(steep_indices) > 50 else 'medium' if len(steep_indices) > 20 else 'low'
+        'has_problem': count > 0,
+        'severity': 'high' if count > 50 else 'medium' if count > 20 else 'low'
     }
\ No newline at end of file
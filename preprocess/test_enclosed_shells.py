@@ -0,0 +1,87 @@
+"""
+Test script for enclosed shell detection on multi-shell parts.
+"""
+
+import sys
+sys.path.append('preprocess')
+
+import trimesh
+from internal_volumes_check import find_enclosed_shells, realistic_internal_volumes
+
+def box_with_cavity():
+    """A 20 mm cube with a sealed 5 mm cubic void at its center."""
+    outer = trimesh.creation.box((20, 20, 20))
+    cavity = trimesh.creation.box((5, 5, 5))
+    cavity.invert()  # Void faces point into the void
+    return trimesh.util.concatenate([outer, cavity])
+
+def boxes_in_line():
+    """
+    Two separate 10 mm cubes, the second placed so the first cube's probe
+    face center looks straight through the diagonal edge of its near face.
+    """
+    first = trimesh.creation.box((10, 10, 10))
+    center = first.triangles_center[0]
+    normal = first.face_normals[0]
+
+    second = trimesh.creation.box((10, 10, 10))
+    second.apply_translation(center + normal * 20)
+    return trimesh.util.concatenate([first, second])
+
+def nested_solids():
+    """A 5 mm cube exported inside a 20 mm cube without a boolean union, both facing outward."""
+    outer = trimesh.creation.box((20, 20, 20))
+    inner = trimesh.creation.box((5, 5, 5))
+    return trimesh.util.concatenate([outer, inner])
+
+def overlapping_solids():
+    """Two 10 mm cubes overlapping by half their width, never unioned."""
+    first = trimesh.creation.box((10, 10, 10))
+    second = trimesh.creation.box((10, 10, 10))
+    second.apply_translation((5, 2, 1))
+    return trimesh.util.concatenate([first, second])
+
+def island_in_cavity():
+    """A 20 mm cube with a 10 mm sealed void holding a loose 4 mm cube."""
+    outer = trimesh.creation.box((20, 20, 20))
+    cavity = trimesh.creation.box((10, 10, 10))
+    cavity.invert()
+    island = trimesh.creation.box((4, 4, 4))
+    return trimesh.util.concatenate([outer, cavity, island])
+
+def test_enclosed_shells():
+    """Check enclosed shell counts and severities on the multi-shell parts."""
+
+    print("Testing Enclosed Shell Detection")
+    print("=" * 40)
+
+    cases = [
+        (box_with_cavity(), "Box with sealed cavity", 1, 2),
+        (boxes_in_line(), "Two separate boxes", 0, 0),
+        (nested_solids(), "Nested solids, not unioned", 0, 0),
+        (overlapping_solids(), "Overlapping solids, not unioned", 0, 0),
+        (island_in_cavity(), "Loose body in a sealed cavity", 1, 2),
+    ]
+
+    for mesh, description, expected_shells, expected_severity in cases:
+        print(f"\nTesting: {description}")
+        print("-" * 30)
+
+        # The rtree backend reports a ray through a shared edge once per
+        # triangle, which used to flip the crossing parity
+        backends = [("default", mesh.ray),
+                    ("rtree", trimesh.ray.ray_triangle.RayMeshIntersector(mesh))]
+        for backend_name, intersector in backends:
+            mesh.ray = intersector
+            enclosed = find_enclosed_shells(mesh)
+            severity, _ = realistic_internal_volumes(mesh)
+
+            ok = len(enclosed) == expected_shells and severity == expected_severity
+            print(f"  [{'OK' if ok else 'FAILED'}] {backend_name}: {len(enclosed)} enclosed shells, severity {severity}")
+            assert ok, f"{description} ({backend_name}): expected {expected_shells} shells, severity {expected_severity}"
+
+    print(f"\n{'='*40}")
+    print("Enclosed shell test complete!")
+
+if __name__ == "__main__":
+    test_enclosed_shells()
@@ -1,68 +1,60 @@
 import numpy as np
 import trimesh
+from mesh_utils import MeshCache
 
-def find_undercuts(mesh):
+def find_undercuts(mesh, cache=None):
     """Find undercut faces in mesh - surfaces that face upward and inward."""
-    face_normals = mesh.face_normals
-    face_centers = mesh.triangles_center
+    cache = cache or MeshCache(mesh)
+    face_normals = cache.normals
+    face_centers = cache.centers
     mesh_center = np.mean(face_centers, axis=0)
-    undercut_faces = []
     
-    for i, (center, normal) in enumerate(zip(face_centers, face_normals)):
-        # Look for faces that point upward (positive Z)
-        if normal[2] > 0.3:  # Face points somewhat upward
-            # Check if this face is "hidden" inside the mesh
-            # by comparing face direction with direction from mesh center
-            to_face = center - mesh_center
-            to_face_norm = to_face / (np.linalg.norm(to_face) + 1e-8)
-            
-            # If face normal and position vector point in opposite directions,
-            # this suggests an internal/undercut surface
-            alignment = np.dot(normal, to_face_norm)
-            
-            if alignment < -0.2:  # Face points inward relative to its position
-                undercut_faces.append(i)
+    # Look for faces that point upward (positive Z)
+    upward = face_normals[:, 2] > 0.3  # Face points somewhat upward
     
-    undercut_indices = np.array(undercut_faces)
-    return undercut_indices
+    # Check if each face is "hidden" inside the mesh by comparing face
+    # direction with direction from mesh center
+    to_face = face_centers - mesh_center
+    to_face_norm = to_face / (np.linalg.norm(to_face, axis=1, keepdims=True) + 1e-8)
+    
+    # If face normal and position vector point in opposite directions,
+    # this suggests an internal/undercut surface
+    alignment = np.einsum('ij,ij->i', face_normals, to_face_norm)
+    
+    # Face points inward relative to its position
+    return np.flatnonzero(upward & (alignment < -0.2))
 
 
 
 # In undercut_check.py
-def context_aware_undercuts(mesh):
+def context_aware_undercuts(mesh, cache=None):
     """Improved undercut detection that considers tool access from all directions"""
-    from geometric_context import analyze_face_context
+    from geometric_context import analyze_all_face_contexts
     
-    face_normals = mesh.face_normals
     # Don't limit to upward faces - check all directions
-    all_faces = np.arange(len(face_normals))
+    all_faces = np.arange(len(mesh.faces))
     
-    actual_undercuts = []
-    
-    for face_idx in all_faces:
-        context = analyze_face_context(face_idx, mesh)
-        
-        # Consider it an undercut if no tool access from standard directions
-        if not context['has_tool_access'] and not context['is_external']:
-            actual_undercuts.append(face_idx)
+    context = analyze_all_face_contexts(mesh, cache=cache)
     
-    return np.array(actual_undercuts)
-def analyze_undercuts(mesh, use_context=True):
+    # Consider it an undercut if no tool access from standard directions
+    return all_faces[~context['has_tool_access'] & ~context['is_external']]
+def analyze_undercuts(mesh, use_context=True, cache=None):
     """
     Analyze undercuts with metadata.
     
     Args:
         mesh: trimesh object
         use_context: whether to use context-aware analysis
+        cache: MeshCache for this mesh, built on demand if not given
         
     Returns:
         dict: analysis results with metadata
     """
     if use_context:
-        undercut_indices = context_aware_undercuts(mesh)
+        undercut_indices = context_aware_undercuts(mesh, cache=cache)
         analysis_type = "context-aware"
     else:
-        undercut_indices = find_undercuts(mesh)
+        undercut_indices = find_undercuts(mesh, cache)
         analysis_type = "basic"
     
     return {
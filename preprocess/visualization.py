@@ -4,9 +4,10 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 import io
 import base64
+from mesh_utils import MeshCache
 
-def create_3d_visualization(mesh, problem_regions, score):
-    """Create interactive 3D visualization with Plotly."""
+def create_3d_visualization(mesh, problem_regions, score, cache=None):
+    """Create interactive 3D visualization with Plotly; cache is the analyzer's MeshCache, if any."""
     vertices = mesh.vertices
     faces = mesh.faces
     
@@ -26,7 +27,7 @@ def create_3d_visualization(mesh, problem_regions, score):
     fig.add_trace(go.Mesh3d(
         x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
         i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
-        facecolor=['rgba(34,139,34,0.4)'] * len(faces),
+        color='rgba(34,139,34,0.4)',
         opacity=0.4,
         name=f'CNC-Friendly (Score: {score:.1f}/100)',
         visible=True
@@ -41,19 +42,18 @@ def create_3d_visualization(mesh, problem_regions, score):
         }
     ]
     
+    # One bit per problem region for every face, so each region's faces are a
+    # mask instead of a Python loop over its indices
+    face_flags = problem_face_flags(mesh, problem_regions, cache)
+    
     # Add problem regions
-    for i, (region_name, face_indices) in enumerate(problem_regions):
+    for i, (region_name, _) in enumerate(problem_regions):
         config = problem_config.get(region_name, {'color': 'rgb(128,128,128)', 'emoji': '⚪'})
+        in_region = (face_flags >> i) & 1
         
-        # Handle empty face indices
-        if len(face_indices) == 0:
-            face_indices = get_problem_faces_for_region(region_name, mesh)
-        
-        # With background version
-        face_colors_bg = ['rgba(34,139,34,0.1)'] * len(faces)
-        for idx in face_indices:
-            if 0 <= idx < len(faces):
-                face_colors_bg[idx] = config['color']
+        # With background version; per-face colors, since Plotly drops the
+        # alpha of colorscale colors and the background must stay faint
+        face_colors_bg = np.array(['rgba(34,139,34,0.1)', config['color']], dtype=object)[in_region]
         
         fig.add_trace(go.Mesh3d(
             x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
@@ -64,16 +64,12 @@ def create_3d_visualization(mesh, problem_regions, score):
             visible=False
         ))
         
-        # Isolated version
-        face_colors_iso = ['rgba(0,0,0,0)'] * len(faces)
-        for idx in face_indices:
-            if 0 <= idx < len(faces):
-                face_colors_iso[idx] = config['color']
-        
+        # Isolated version, drawn from the region's faces only in one color
+        region_faces = faces[in_region.view(bool)]
         fig.add_trace(go.Mesh3d(
             x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
-            i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
-            facecolor=face_colors_iso,
+            i=region_faces[:, 0], j=region_faces[:, 1], k=region_faces[:, 2],
+            color=config['color'],
             opacity=1.0,
             name=f'{region_name} (Isolated)',
             visible=False
@@ -114,11 +110,44 @@ def create_3d_visualization(mesh, problem_regions, score):
     
     return fig
 
-def get_problem_faces_for_region(region_name, mesh):
+def problem_face_flags(mesh, problem_regions, cache=None):
+    """
+    Per-face bitmask of the problem regions each face belongs to.
+    
+    Args:
+        mesh: trimesh object
+        problem_regions: list of (region_name, face_indices), at most 64
+        cache: MeshCache for this mesh, built on demand if needed
+    
+    Returns:
+        np.ndarray: (F,) flags of the narrowest unsigned type with a bit per
+            region, bit i set for faces in region i
+    """
+    if len(problem_regions) > 64:
+        raise ValueError(f"At most 64 problem regions can be flagged, got {len(problem_regions)}")
+    
+    face_count = len(mesh.faces)
+    flag_type = np.min_scalar_type((1 << max(len(problem_regions), 1)) - 1)
+    face_flags = np.zeros(face_count, dtype=flag_type)
+    
+    for i, (region_name, face_indices) in enumerate(problem_regions):
+        # Handle empty face indices
+        if len(face_indices) == 0:
+            face_indices = get_problem_faces_for_region(region_name, mesh, cache)
+        
+        face_indices = np.asarray(face_indices, dtype=np.int64)
+        face_indices = face_indices[(face_indices >= 0) & (face_indices < face_count)]
+        face_flags[face_indices] |= flag_type.type(1 << i)
+    
+    return face_flags
+
+def get_problem_faces_for_region(region_name, mesh, cache=None):
     """Get face indices for regions without specific faces."""
     if "Internal" in region_name:
-        face_normals = mesh.face_normals
-        face_centers = mesh.triangles_center
+        # Reuse the per-face geometry the analyses already read from the mesh
+        cache = cache or MeshCache(mesh)
+        face_normals = cache.normals
+        face_centers = cache.centers
         mesh_center = np.mean(mesh.vertices, axis=0)
         
         to_face = face_centers - mesh_center
@@ -4,6 +4,59 @@ sys.path.append('preprocess')
 import trimesh
 import numpy as np
 
+from mesh_utils import first_ray_distances
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba is optional; the numpy implementations below are used instead
+    NUMBA_AVAILABLE = False
+
+# Standard CNC machining directions (top-down and 4 horizontal sides)
+MACHINING_DIRECTIONS = np.array([
+    [0, 0, -1],  # Top-down (most common)
+    [1, 0, 0],   # +X direction
+    [-1, 0, 0],  # -X direction
+    [0, 1, 0],   # +Y direction
+    [0, -1, 0],  # -Y direction
+], dtype=np.float64)
+
+# Rays start this far back from the face along each machining direction
+RAY_START_DISTANCE = 100.0
+
+def improved_has_clear_tool_access_batch(face_centers, face_normals, mesh, tool_diameter=3.0):
+    """
+    Improved tool access check for many faces, casting every ray in one batch.
+    
+    A face is reachable from a machining direction if its normal does not point
+    away from the tool, and a ray cast from far away along that direction
+    reaches the face before hitting other geometry.
+    """
+    face_centers = np.asarray(face_centers, dtype=np.float64).reshape(-1, 3)
+    face_normals = np.asarray(face_normals, dtype=np.float64).reshape(-1, 3)
+    tool_radius = tool_diameter / 2.0
+    
+    # (N, 5) face/direction pairs worth a ray; faces pointing away from the tool
+    # (same direction as the approach) are not accessible from it
+    candidates = face_normals @ MACHINING_DIRECTIONS.T <= 0.3
+    face_idx, dir_idx = np.nonzero(candidates)
+    
+    try:
+        directions = MACHINING_DIRECTIONS[dir_idx]
+        ray_starts = face_centers[face_idx] - directions * RAY_START_DISTANCE
+        first_hit_distances = first_ray_distances(mesh, ray_starts, directions)
+    except Exception:
+        # If ray casting fails, assume accessible (conservative)
+        return np.ones(len(face_centers), dtype=bool)
+    
+    # Clear path if the ray escapes, obstructed if the first hit is well before the face
+    clear = np.isnan(first_hit_distances) | (first_hit_distances >= RAY_START_DISTANCE - tool_radius)
+    
+    accessible = np.zeros(len(face_centers), dtype=bool)
+    accessible[face_idx[clear]] = True
+    return accessible
+
 def improved_has_clear_tool_access(face_center, face_normal, mesh, tool_diameter=3.0):
     """
     Improved tool access check that properly detects dovetail undercuts.
@@ -12,103 +65,91 @@ def improved_has_clear_tool_access(face_center, face_normal, mesh, tool_diameter
     inward (negative direction) but there's no clear path for a tool to reach
     the surface from that direction due to the geometry.
     """
-    # Standard CNC machining directions (top-down and 4 horizontal sides)
-    machining_directions = [
-        np.array([0, 0, -1]),  # Top-down (most common)
-        np.array([1, 0, 0]),   # +X direction
-        np.array([-1, 0, 0]),  # -X direction  
-        np.array([0, 1, 0]),   # +Y direction
-        np.array([0, -1, 0]),  # -Y direction
-    ]
+    return bool(improved_has_clear_tool_access_batch(face_center, face_normal, mesh, tool_diameter)[0])
+
+def _candidate_undercut_mask_numpy(face_centers, face_normals, mesh_bounds, mesh_center,
+                                   tolerance, align_threshold):
+    """Faces that point inward relative to their position and are not on the external boundary."""
+    # Face normals from trimesh are already unit length, so only the direction
+    # from the mesh center needs scaling; divide the dot product instead of
+    # building a normalized copy of it
+    to_face = face_centers - mesh_center
+    to_face_length = np.sqrt(np.einsum('ij,ij->i', to_face, to_face)) + 1e-8
+    alignment = np.einsum('ij,ij->i', face_normals, to_face) / to_face_length
     
-    tool_radius = tool_diameter / 2.0
-    accessible_directions = 0
+    # Within tolerance of any of the 6 bounding planes (external)
+    boundary_distances = np.abs(face_centers[:, None, :] - mesh_bounds[None, :, :])
+    is_external = np.any(boundary_distances < tolerance, axis=(1, 2))
     
-    for direction in machining_directions:
-        # Check if the face normal is roughly aligned with the tool approach direction
-        # If the face normal points away from the tool direction, it's potentially accessible
-        alignment = np.dot(face_normal, direction)
-        
-        # If face normal points in the same direction as tool approach, it's not accessible
-        if alignment > 0.3:  # Face points away from tool
-            continue
-            
-        # Cast ray from far away towards the face
-        ray_start = face_center - direction * 100.0  # Start far away
-        ray_end = face_center + direction * 0.1      # End just past the face
+    return (alignment < align_threshold) & ~is_external
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _candidate_undercut_mask_jit(face_centers, face_normals, mesh_bounds, mesh_center,
+                                     tolerance, align_threshold):
+        """Compiled equivalent of _candidate_undercut_mask_numpy, one pass over the faces."""
+        n = face_centers.shape[0]
+        mask = np.empty(n, dtype=np.bool_)
         
-        try:
-            # Check if ray hits any geometry before reaching the target face
-            locations, ray_indices, face_indices = mesh.ray.intersects_location(
-                ray_origins=ray_start.reshape(1, -1),
-                ray_directions=direction.reshape(1, -1)
-            )
-            
-            if len(locations) == 0:
-                # No intersections - clear path
-                accessible_directions += 1
-                continue
+        for i in prange(n):
+            # Inward alignment of the (unit) normal with the direction from the mesh center
+            length_sq = 0.0
+            dot = 0.0
+            for axis in range(3):
+                d = face_centers[i, axis] - mesh_center[axis]
+                length_sq += d * d
+                dot += face_normals[i, axis] * d
+            alignment = dot / (np.sqrt(length_sq) + 1e-8)
             
-            # Check if first intersection is close to our target face
-            distances = np.linalg.norm(locations - ray_start, axis=1)
-            target_distance = np.linalg.norm(face_center - ray_start)
+            is_external = False
+            for axis in range(3):
+                if (abs(face_centers[i, axis] - mesh_bounds[0, axis]) < tolerance or
+                        abs(face_centers[i, axis] - mesh_bounds[1, axis]) < tolerance):
+                    is_external = True
             
-            if len(distances) > 0:
-                first_hit_distance = np.min(distances)
-                
-                # If first hit is much closer than target, there's an obstruction
-                if first_hit_distance < target_distance - tool_radius:
-                    continue  # Obstructed
-                else:
-                    accessible_directions += 1
-                    
-        except Exception:
-            # If ray casting fails, assume accessible (conservative)
-            accessible_directions += 1
-    
-    return accessible_directions > 0
+            mask[i] = alignment < align_threshold and not is_external
+        
+        return mask
 
-def improved_context_aware_undercuts(mesh):
+def candidate_undercut_mask(face_centers, face_normals, mesh_bounds, tolerance=2.0, align_threshold=-0.1,
+                            mesh_center=None):
+    """
+    Mask of faces that enter the ray-cast stage of improved_context_aware_undercuts.
+    
+    mesh_center defaults to the mean of face_centers; pass mesh.centroid to
+    reuse trimesh's cached, area-weighted center instead.
+    """
+    face_centers = np.ascontiguousarray(face_centers, dtype=np.float64)
+    face_normals = np.ascontiguousarray(face_normals, dtype=np.float64)
+    mesh_bounds = np.ascontiguousarray(mesh_bounds, dtype=np.float64)
+    if mesh_center is None:
+        mesh_center = face_centers.mean(axis=0)
+    mesh_center = np.ascontiguousarray(mesh_center, dtype=np.float64)
+    
+    if NUMBA_AVAILABLE:
+        return _candidate_undercut_mask_jit(face_centers, face_normals, mesh_bounds, mesh_center,
+                                            float(tolerance), float(align_threshold))
+    return _candidate_undercut_mask_numpy(face_centers, face_normals, mesh_bounds, mesh_center,
+                                          tolerance, align_threshold)
+
+def improved_context_aware_undercuts(mesh, tolerance=2.0):
     """
     Improved undercut detection that properly identifies dovetail undercuts.
     """
     face_normals = mesh.face_normals
     face_centers = mesh.triangles_center
-    mesh_bounds = mesh.bounds
     
-    undercut_faces = []
+    # Focus on faces that point inward relative to their position (key
+    # characteristic of undercuts), skipping external ones
+    candidates = np.flatnonzero(candidate_undercut_mask(face_centers, face_normals, mesh.bounds, tolerance,
+                                                        mesh_center=mesh.centroid))
     
-    # Focus on faces that could be problematic undercuts
-    for i, (center, normal) in enumerate(zip(face_centers, face_normals)):
-        # Check if face points inward (key characteristic of undercuts)
-        mesh_center = np.mean(face_centers, axis=0)
-        to_face = center - mesh_center
-        to_face_norm = to_face / (np.linalg.norm(to_face) + 1e-8)
-        
-        # Face points inward relative to its position
-        alignment = np.dot(normal, to_face_norm)
-        
-        if alignment < -0.1:  # Face points inward
-            # Check if it's not on the external boundary
-            is_external = False
-            tolerance = 2.0
-            for axis in range(3):
-                for bound_idx in [0, 1]:
-                    distance_to_boundary = abs(center[axis] - mesh_bounds[bound_idx, axis])
-                    if distance_to_boundary < tolerance:
-                        is_external = True
-                        break
-                if is_external:
-                    break
-            
-            if not is_external:
-                # Check tool access with improved method
-                has_access = improved_has_clear_tool_access(center, normal, mesh)
-                
-                if not has_access:
-                    undercut_faces.append(i)
-    
-    return np.array(undercut_faces)
+    # Check tool access with improved method, for every candidate at once
+    has_access = improved_has_clear_tool_access_batch(
+        face_centers[candidates], face_normals[candidates], mesh
+    )
+    
+    return candidates[~has_access]
 
 # Test the improved detection
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ Simple command-line interface for running FDM simulation with visualization.
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from fdm_simulation import FDMSimulator
 from fdm_visualization import FDMVisualizer
 import webbrowser
@@ -50,29 +51,29 @@ def run_visual_simulation(stl_file_path: str, open_browser: bool = True):
             results['detailed_analysis']['geometry']['overhang_analysis']
         )
         
-        # Generate visualizations
+        # Generate visualizations as (figure, file, description) jobs
         base_name = os.path.splitext(os.path.basename(stl_file_path))[0]
         
         # 3D Mesh View
-        mesh_fig = visualizer.create_3d_mesh_view()
-        mesh_file = f"fdm_mesh_{base_name}.html"
-        visualizer.save_visualization_html(mesh_fig, mesh_file)
+        jobs = [(visualizer.create_3d_mesh_view(), f"fdm_mesh_{base_name}.html", "3D mesh view")]
         
         # Layer Animation (limited layers for performance)
-        animation_fig = visualizer.create_layer_by_layer_animation(max_layers=20)
-        animation_file = f"fdm_animation_{base_name}.html"
-        visualizer.save_visualization_html(animation_fig, animation_file)
+        jobs.append((visualizer.create_layer_by_layer_animation(max_layers=20),
+                     f"fdm_animation_{base_name}.html", "layer animation"))
         
         # Print Paths
         if simulator.layers:
-            path_fig = visualizer.create_print_path_visualization(len(simulator.layers)//2)
-            path_file = f"fdm_paths_{base_name}.html"
-            visualizer.save_visualization_html(path_fig, path_file)
+            jobs.append((visualizer.create_print_path_visualization(len(simulator.layers)//2),
+                         f"fdm_paths_{base_name}.html", "print paths"))
         
         # Analytics Dashboard
-        dashboard_fig = visualizer.create_printing_analytics_dashboard(results)
         dashboard_file = f"fdm_dashboard_{base_name}.html"
-        visualizer.save_visualization_html(dashboard_fig, dashboard_file)
+        jobs.append((visualizer.create_printing_analytics_dashboard(results), dashboard_file, "analytics dashboard"))
+        
+        # Each file is a multi-MB HTML write; overlap them instead of writing
+        # one after another
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            list(executor.map(lambda job: visualizer.save_visualization_html(job[0], job[1]), jobs))
         
         # Print summary
         rl_metrics = results['rl_metrics']
@@ -87,10 +88,8 @@ def run_visual_simulation(stl_file_path: str, open_browser: bool = True):
         print("=" * 60)
         
         print("\nGenerated Visualization Files:")
-        print(f"  - {mesh_file} (3D mesh view)")
-        print(f"  - {animation_file} (layer animation)")
-        print(f"  - {path_file} (print paths)")
-        print(f"  - {dashboard_file} (analytics dashboard)")
+        for _, file_name, description in jobs:
+            print(f"  - {file_name} ({description})")
         
         # Open in browser if requested
         if open_browser: